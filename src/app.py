@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from google.cloud import bigquery
-from google.oauth2 import service_account
 
 # Load Watch Catalogue
 watch_catalogue = pd.read_csv("./data/watch_catalogue.csv")
@@ -10,16 +8,11 @@ watch_catalogue = pd.read_csv("./data/watch_catalogue.csv")
 import streamlit as st
 import pandas as pd
 import altair as alt
-from google.cloud import bigquery
-from google.oauth2 import service_account
 
-# ------------------------------------------------------------------------------
-# Credentials via Streamlit secrets
-# ------------------------------------------------------------------------------
-credentials = service_account.Credentials.from_service_account_info(
-    st.secrets["gcp_service_account"]
+from price_data import (
+    arbitrage_table_date, invalidate_query_cache, query_arbitrage_snapshot, query_brands, query_products,
+    refresh_arbitrage_table
 )
-client = bigquery.Client(credentials=credentials, project=credentials.project_id)
 
 # ------------------------------------------------------------------------------
 # Load Watch Catalogue CSV (for Tag Heuer product names)
@@ -63,24 +56,21 @@ st.write(
 # ------------------------------------------------------------------------------
 # Brand & Product Selections
 # ------------------------------------------------------------------------------
-query_brands = """
-SELECT DISTINCT brand
-FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-ORDER BY brand
-"""
-brands_df = client.query(query_brands).to_dataframe()
+if st.sidebar.button("Refresh data"):
+    # Drop cached query results and load the newly loaded prices into the arbitrage table
+    invalidate_query_cache()
+    refresh_arbitrage_table()
+table_date = arbitrage_table_date()
+if table_date is not None:
+    st.sidebar.caption(f"Arbitrage table as of {table_date:%Y-%m-%d}")
+
+brands_df = query_brands()
 brand_options = brands_df["brand"].dropna().unique().tolist()
 
 selected_brand = st.sidebar.selectbox("Select Brand", brand_options)
 
 if selected_brand:
-    query_products = f"""
-    SELECT DISTINCT reference_code
-    FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-    WHERE brand = '{selected_brand}'
-    ORDER BY reference_code
-    """
-    products_df = client.query(query_products).to_dataframe()
+    products_df = query_products(selected_brand)
     product_options = products_df["reference_code"].dropna().unique().tolist()
 
     # ✅ If Tag Heuer, replace reference_code with watch_name
@@ -103,70 +93,28 @@ if selected_product:
         if not reference_code_lookup.empty:
             selected_product = reference_code_lookup.iloc[0]  # Use reference_code for queries
 
-    # 1) Get latest date
-    query_latest_date = f"""
-    SELECT MAX(life_span_date) as latest_date
-    FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-    WHERE brand = '{selected_brand}' AND reference_code = '{selected_product}'
-    """
-    latest_date_df = client.query(query_latest_date).to_dataframe()
+    # 1) Get the price data of the latest date
+    data_df = query_arbitrage_snapshot(selected_brand, selected_product)
 
-    if latest_date_df.empty or pd.isnull(latest_date_df["latest_date"].iloc[0]):
+    if data_df.empty:
         st.error("No data found for the selected product.")
     else:
-        latest_date = latest_date_df["latest_date"].iloc[0]
-
-        # 2) Get price data for that date
-        query_data = f"""
-        SELECT
-          reference_code,
-          brand,
-          life_span_date,
-          country,
-          currency,
-          price
-        FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-        WHERE brand = '{selected_brand}'
-          AND reference_code = '{selected_product}'
-          AND life_span_date = '{latest_date}'
-        """
-        data_df = client.query(query_data).to_dataframe()
-
-        st.subheader(f"Data for {selected_brand} {selected_product} on {latest_date}")
-
-        # 3) Convert all prices to USD
-        exchange_rates = {
-            'USD': 1.00,
-            'CHF': 1.10,
-            'CNY': 0.15,
-            'EUR': 1.08,
-            'GBP': 1.24,
-            'HKD': 0.13,
-            'JPY': 0.0074,
-            'SGD': 0.75,
-            'TWD': 0.033,
-            'AED': 0.27,
-            'KRW': 0.00076
-        }
-        data_df["price_usd"] = data_df.apply(
-            lambda row: row["price"] * exchange_rates.get(row["currency"], 1.0),
-            axis=1
-        )
+        latest_date = data_df["life_span_date"].iloc[0]
+
+        st.subheader(f"Data for {selected_brand} {selected_product} on {latest_date:%Y-%m-%d}")
+
+        # 2) USD prices and the base currency (USD → EUR → HKD) come precomputed
+        #    with the snapshot (see arbitrage.price_differences())
+        unknown = data_df.loc[data_df["price_usd"].isna() & data_df["price"].notna(), "currency"].unique()
+        if len(unknown):
+            st.warning(f"No exchange rate for {', '.join(unknown)}, these prices are not converted.")
+
+        # 3) Base currency of the product, if it is listed in USD, EUR or HKD
+        base_rows = data_df.dropna(subset=["base_currency", "base_price_usd"])
+        base_currency = base_rows["base_currency"].iloc[0] if not base_rows.empty else None
+        base_price_usd = base_rows["base_price_usd"].iloc[0] if not base_rows.empty else None
 
-        # 4) Determine base currency (USD → EUR → HKD)
-        base_currency = None
-        base_price_usd = None
-        if "USD" in data_df["currency"].values:
-            base_currency = "USD"
-            base_price_usd = data_df.loc[data_df["currency"] == "USD", "price_usd"].iloc[0]
-        elif "EUR" in data_df["currency"].values:
-            base_currency = "EUR"
-            base_price_usd = data_df.loc[data_df["currency"] == "EUR", "price_usd"].iloc[0]
-        elif "HKD" in data_df["currency"].values:
-            base_currency = "HKD"
-            base_price_usd = data_df.loc[data_df["currency"] == "HKD", "price_usd"].iloc[0]
-
-        # 5) Build Altair Chart
+        # 4) Build Altair Chart
         base_chart = alt.Chart(data_df).mark_bar().encode(
             x=alt.X("currency:N", title="Currency"),
             y=alt.Y("price_usd:Q", title="Price in USD"),
@@ -191,14 +139,12 @@ if selected_product:
 
         st.altair_chart(chart, use_container_width=True)
 
-        # 6) Arbitrage Table
+        # 5) Arbitrage Table
         st.subheader("Arbitrage Opportunity Details")
         if base_currency and base_price_usd is not None:
             st.write(f"**Base Currency:** {base_currency} — Converted to USD: {base_price_usd:.2f}")
-            data_df["diff_vs_base"] = data_df["price_usd"] - base_price_usd
         else:
             st.write("No USD, EUR, or HKD listing found.")
-            data_df["diff_vs_base"] = None
 
         st.dataframe(data_df[["currency", "price", "price_usd", "diff_vs_base"]].rename(
             columns={"currency": "Currency", "price": "Original Price", "price_usd": "Price in USD", "diff_vs_base": f"Difference vs. {base_currency if base_currency else 'None'}"}
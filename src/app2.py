@@ -1,49 +1,93 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from google.cloud import bigquery
-from google.oauth2 import service_account
+
+from fx import load_rate_table
+from price_data import (
+    arbitrage_table_date, invalidate_query_cache, query_arbitrage_snapshot, query_brands, query_products,
+    query_timeseries, refresh_arbitrage_table
+)
 
 # For forecasting
-from prophet import Prophet
+from forecast_cache import ForecastCache
+from forecast_store import ForecastStore, daily_price_series
+from fast_forecast import damped_trend_forecast
+from trends_store import TrendsStore
+from chart_data import downsample_line
 
 # ------------------------------------------------------------------------------
-# Credentials via Streamlit secrets
+# 1) Load Watch Catalogue CSV
 # ------------------------------------------------------------------------------
-credentials = service_account.Credentials.from_service_account_info(
-    st.secrets["gcp_service_account"]
-)
-client = bigquery.Client(credentials=credentials, project=credentials.project_id)
+watch_catalogue = pd.read_csv("./data/watch_catalogue.csv")  # Update path if needed
 
 # ------------------------------------------------------------------------------
-# 1) Load Watch Catalogue CSV
+# Fitted forecast models, shared by all sessions and persisted in data/forecast_cache
 # ------------------------------------------------------------------------------
-watch_catalogue = pd.read_csv("./data/watch_catalogue.csv")  # Update path if needed
+@st.cache_resource
+def get_forecast_cache():
+    return ForecastCache()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_price_forecast(reference_code):
+    return ForecastStore().load(reference_code)
+
+
+FORECAST_ENGINES = {
+    "refine": "Fast, refined by Prophet in the background",
+    "fast": "Fast (exponential smoothing)",
+    "prophet": "Prophet"
+}
+
+
+def forecast_series(series, engine, periods=180):
+    """
+    Forecasts a (ds, y) series with the selected engine.
+
+    Returns the forecast and, while a Prophet refinement is still running in the
+    background, its Future (None otherwise). If Prophet fails on the series, the fast
+    forecast is returned with a warning.
+    """
+    if engine == "fast":
+        return damped_trend_forecast(series, periods=periods), None
+    if engine == "prophet":
+        try:
+            return get_forecast_cache().get_or_fit(series, periods=periods)[1], None
+        except Exception as e:
+            st.warning(f"Prophet could not fit this series ({e}), showing the fast forecast instead.")
+            return damped_trend_forecast(series, periods=periods), None
+
+    cached = get_forecast_cache().lookup(series, periods=periods)
+    if cached is not None:
+        return cached[1], None
+    failure = get_forecast_cache().failure(series, periods=periods)
+    if failure is not None:
+        st.warning(f"Prophet could not refine this forecast ({failure}), showing the fast forecast.")
+        return damped_trend_forecast(series, periods=periods), None
+    refinement = get_forecast_cache().fit_in_background(series, periods=periods)
+    return damped_trend_forecast(series, periods=periods), refinement
+
+
+@st.fragment(run_every=2)
+def wait_for_refinement(refinement):
+    # Polls the background fit and reruns the app once it is done, which swaps in the Prophet
+    # chart, or after a failed fit keeps the fast chart with a warning and stops polling
+    if refinement.done():
+        st.rerun()
+    st.caption("Fast forecast shown, Prophet is refining it in the background...")
 
 # ------------------------------------------------------------------------------
-# 2) Load Google Trends CSVs with the structure from your screenshot
-#    1st row: "Category: All categories"
-#    2nd row: "Day,Audemars Piguet: (Worldwide)"
-#    3rd row onward: "2024-11-19,56", ...
+# Exchange rates to USD for the price forecasts (dated rates from data/fx_rates.csv if present, see fx.py)
 # ------------------------------------------------------------------------------
-def load_trends_csv(filepath):
-    # Skip first row (Category) and treat second row as the header
-    df = pd.read_csv(filepath, skiprows=1, header=0)
-    # The CSV likely has columns like ["Day", "Audemars Piguet: (Worldwide)"]
-    # or ["Day", "Tag Heuer: (Worldwide)"]
-    # So let's rename them to ["date", "score"]
-    df.rename(columns={df.columns[0]: "date", df.columns[1]: "score"}, inplace=True)
-    # Convert date column to datetime
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    # Drop any rows where date is missing
-    df.dropna(subset=["date"], inplace=True)
-    # Let’s rename "score" to "trend"
-    df.rename(columns={"score": "trend"}, inplace=True)
-    return df
-
-# Load each brand's CSV
-tag_heuer_trends = load_trends_csv("./data/multiTimelineTH.csv")
-audemars_trends = load_trends_csv("./data/multiTimelineAP.csv")
+rate_table = load_rate_table()
+
+# ------------------------------------------------------------------------------
+# 2) Google Trends exports (data/multiTimeline*.csv, one per brand, see trends_store.py)
+#    Each brand's file is parsed on first use and again only after it changed
+# ------------------------------------------------------------------------------
+@st.cache_resource
+def get_trends_store():
+    return TrendsStore()
 
 # # ------------------------------------------------------------------------------
 # # Set Page Config
@@ -83,24 +127,23 @@ st.write(
 # ------------------------------------------------------------------------------
 # Brand & Product Selections
 # ------------------------------------------------------------------------------
-query_brands = """
-SELECT DISTINCT brand
-FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-ORDER BY brand
-"""
-brands_df = client.query(query_brands).to_dataframe()
+if st.sidebar.button("Refresh data"):
+    # Drop cached query results and load the newly loaded prices into the arbitrage table
+    invalidate_query_cache()
+    refresh_arbitrage_table()
+table_date = arbitrage_table_date()
+if table_date is not None:
+    st.sidebar.caption(f"Arbitrage table as of {table_date:%Y-%m-%d}")
+
+forecast_engine = st.sidebar.selectbox("Forecast Engine", list(FORECAST_ENGINES), format_func=FORECAST_ENGINES.get)
+
+brands_df = query_brands()
 brand_options = brands_df["brand"].dropna().unique().tolist()
 
 selected_brand = st.sidebar.selectbox("Select Brand", brand_options)
 
 if selected_brand:
-    query_products = f"""
-    SELECT DISTINCT reference_code
-    FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-    WHERE brand = '{selected_brand}'
-    ORDER BY reference_code
-    """
-    products_df = client.query(query_products).to_dataframe()
+    products_df = query_products(selected_brand)
     product_options = products_df["reference_code"].dropna().unique().tolist()
 
     # If Tag Heuer, replace reference_code with watch_name from watch_catalogue
@@ -123,70 +166,28 @@ if selected_product:
         if not reference_code_lookup.empty:
             selected_product = reference_code_lookup.iloc[0]  # Use reference_code
 
-    # 1) Get latest date
-    query_latest_date = f"""
-    SELECT MAX(life_span_date) as latest_date
-    FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-    WHERE brand = '{selected_brand}' AND reference_code = '{selected_product}'
-    """
-    latest_date_df = client.query(query_latest_date).to_dataframe()
+    # 1) Get the price data of the latest date
+    data_df = query_arbitrage_snapshot(selected_brand, selected_product)
 
-    if latest_date_df.empty or pd.isnull(latest_date_df["latest_date"].iloc[0]):
+    if data_df.empty:
         st.error("No data found for the selected product.")
     else:
-        latest_date = latest_date_df["latest_date"].iloc[0]
-
-        # 2) Get price data for that date
-        query_data = f"""
-        SELECT
-          reference_code,
-          brand,
-          life_span_date,
-          country,
-          currency,
-          price
-        FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-        WHERE brand = '{selected_brand}'
-          AND reference_code = '{selected_product}'
-          AND life_span_date = '{latest_date}'
-        """
-        data_df = client.query(query_data).to_dataframe()
-
-        st.subheader(f"Data for {selected_brand} {selected_product} on {latest_date}")
-
-        # 3) Convert all prices to USD
-        exchange_rates = {
-            'USD': 1.00,
-            'CHF': 1.10,
-            'CNY': 0.15,
-            'EUR': 1.08,
-            'GBP': 1.24,
-            'HKD': 0.13,
-            'JPY': 0.0074,
-            'SGD': 0.75,
-            'TWD': 0.033,
-            'AED': 0.27,
-            'KRW': 0.00076
-        }
-        data_df["price_usd"] = data_df.apply(
-            lambda row: row["price"] * exchange_rates.get(row["currency"], 1.0),
-            axis=1
-        )
+        latest_date = data_df["life_span_date"].iloc[0]
+
+        st.subheader(f"Data for {selected_brand} {selected_product} on {latest_date:%Y-%m-%d}")
+
+        # 2) USD prices and the base currency (USD -> EUR -> HKD) come precomputed
+        #    with the snapshot (see arbitrage.price_differences())
+        unknown = data_df.loc[data_df["price_usd"].isna() & data_df["price"].notna(), "currency"].unique()
+        if len(unknown):
+            st.warning(f"No exchange rate for {', '.join(unknown)}, these prices are not converted.")
+
+        # 3) Base currency of the product, if it is listed in USD, EUR or HKD
+        base_rows = data_df.dropna(subset=["base_currency", "base_price_usd"])
+        base_currency = base_rows["base_currency"].iloc[0] if not base_rows.empty else None
+        base_price_usd = base_rows["base_price_usd"].iloc[0] if not base_rows.empty else None
 
-        # 4) Determine base currency (USD -> EUR -> HKD)
-        base_currency = None
-        base_price_usd = None
-        if "USD" in data_df["currency"].values:
-            base_currency = "USD"
-            base_price_usd = data_df.loc[data_df["currency"] == "USD", "price_usd"].iloc[0]
-        elif "EUR" in data_df["currency"].values:
-            base_currency = "EUR"
-            base_price_usd = data_df.loc[data_df["currency"] == "EUR", "price_usd"].iloc[0]
-        elif "HKD" in data_df["currency"].values:
-            base_currency = "HKD"
-            base_price_usd = data_df.loc[data_df["currency"] == "HKD", "price_usd"].iloc[0]
-
-        # 5) Build Altair Chart
+        # 4) Build Altair Chart
         base_chart = alt.Chart(data_df).mark_bar().encode(
             x=alt.X("currency:N", title="Currency"),
             y=alt.Y("price_usd:Q", title="Price in USD"),
@@ -215,14 +216,12 @@ if selected_product:
 
         st.altair_chart(chart, use_container_width=True)
 
-        # 6) Arbitrage Table
+        # 5) Arbitrage Table
         st.subheader("Arbitrage Opportunity Details")
         if base_currency and base_price_usd is not None:
             st.write(f"**Base Currency:** {base_currency} — Converted to USD: {base_price_usd:.2f}")
-            data_df["diff_vs_base"] = data_df["price_usd"] - base_price_usd
         else:
             st.write("No USD, EUR, or HKD listing found.")
-            data_df["diff_vs_base"] = None
 
         st.dataframe(data_df[["currency", "price", "price_usd", "diff_vs_base"]].rename(
             columns={
@@ -234,20 +233,16 @@ if selected_product:
         ))
 
         # ------------------------------------------------------------------------------
-        # 7) Google Trends Line Chart (only for Tag Heuer & Audemars Piguet)
+        # 6) Google Trends Line Chart (for brands with a trends export)
         # ------------------------------------------------------------------------------
-        if selected_brand in ["Tag Heuer", "Audemars Piguet"]:
+        trends_df = get_trends_store().load(selected_brand)
+        if trends_df is not None:
             st.subheader(f"Google Trends for {selected_brand}")
 
-            # Pick the correct DataFrame
-            if selected_brand == "Tag Heuer":
-                trends_df = tag_heuer_trends.copy()
-            else:
-                trends_df = audemars_trends.copy()
-
             # Simple line chart of the historical trends
+            # (line charts only carry the encoded columns, downsampled to the chart width, see chart_data.py)
             trends_chart = (
-                alt.Chart(trends_df, title=f"Google Trends Over Time — {selected_brand}")
+                alt.Chart(downsample_line(trends_df, "date", "trend"), title=f"Google Trends Over Time — {selected_brand}")
                 .mark_line(color="cyan")
                 .encode(
                     x=alt.X("date:T", title="Date"),
@@ -265,77 +260,41 @@ if selected_product:
             st.altair_chart(trends_chart, use_container_width=True)
 
         # ------------------------------------------------------------------------------
-        # 8) Forecasting (only if brand == "Tag Heuer")
+        # 7) Forecasting (only if brand == "Tag Heuer" and its trends export exists)
         # ------------------------------------------------------------------------------
-        if selected_brand == "Tag Heuer":
+        if selected_brand == "Tag Heuer" and trends_df is None:
+            st.info("No Google Trends export for Tag Heuer in data/ (see make refresh-trends), "
+                    "so no forecast is shown.")
+        elif selected_brand == "Tag Heuer":
             st.subheader("Forecasting Google Trends & Average Price in USD")
 
             # ~~~ Forecast Google Trends ~~~
-            # Prepare the data for Prophet: ds, y
-            prophet_trends_df = tag_heuer_trends.rename(columns={"date": "ds", "trend": "y"}).copy()
-
-            # Fit Prophet on the historical Google trends
-            m_trends = Prophet()
-            m_trends.fit(prophet_trends_df)
-
-            # Forecast for the next 6 months
-            future_trends = m_trends.make_future_dataframe(periods=180)  # 180 days
-            forecast_trends = m_trends.predict(future_trends)
+            # Prepare the data for the forecast: ds, y
+            # (the series is the same for every product, so Prophet fits it only once)
+            prophet_trends_df = trends_df.rename(columns={"date": "ds", "trend": "y"})
+            forecast_trends, trends_refinement = forecast_series(prophet_trends_df, forecast_engine)
 
             # ~~~ Forecast Average Price in USD ~~~
-            # 1) Get all historical data for Tag Heuer + selected_product
-            query_timeseries = f"""
-            SELECT
-              life_span_date,
-              currency,
-              price
-            FROM `edhec-business-manageme.luxurydata2502.price-monitoring-2022`
-            WHERE brand = '{selected_brand}'
-              AND reference_code = '{selected_product}'
-            ORDER BY life_span_date
-            """
-            full_data_df = client.query(query_timeseries).to_dataframe()
-
-            # 2) Convert to USD
-            exchange_rates = {
-                'USD': 1.00,
-                'CHF': 1.10,
-                'CNY': 0.15,
-                'EUR': 1.08,
-                'GBP': 1.24,
-                'HKD': 0.13,
-                'JPY': 0.0074,
-                'SGD': 0.75,
-                'TWD': 0.033,
-                'AED': 0.27,
-                'KRW': 0.00076
-            }
-            full_data_df["price_usd"] = full_data_df.apply(
-                lambda row: row["price"] * exchange_rates.get(row["currency"], 1.0),
-                axis=1
-            )
-            # 3) Average by date (if multiple countries on the same date)
-            price_by_date = (
-                full_data_df.groupby("life_span_date")["price_usd"]
-                .mean()
-                .reset_index()
-                .rename(columns={"life_span_date": "ds", "price_usd": "y"})
-            )
-            # Remove null
-            price_by_date.dropna(subset=["ds", "y"], inplace=True)
+            # Precomputed by the batch job (make forecast-prices), forecast here only if missing
+            forecast_price = load_price_forecast(selected_product)
+            price_refinement = None
+
+            if forecast_price is None:
+                # 1) Get all historical data for Tag Heuer + selected_product
+                full_data_df = query_timeseries(selected_brand, selected_product)
 
-            if len(price_by_date) > 2:
-                # Fit Prophet for the price time series
-                m_price = Prophet()
-                m_price.fit(price_by_date)
+                # 2) Average price in USD by date (if multiple countries on the same date)
+                price_by_date = daily_price_series(full_data_df, rates=rate_table)
 
-                future_price = m_price.make_future_dataframe(periods=180)  # 6 months
-                forecast_price = m_price.predict(future_price)
+                if len(price_by_date) > 2:
+                    # Forecast the price time series for 6 months
+                    forecast_price, price_refinement = forecast_series(price_by_date, forecast_engine)
 
+            if forecast_price is not None:
                 # --- Display the forecasts ---
                 st.write("**Google Trends Forecast**")
                 forecast_trends_chart = (
-                    alt.Chart(forecast_trends)
+                    alt.Chart(downsample_line(forecast_trends, "ds", "yhat"))
                     .mark_line(color="cyan")
                     .encode(
                         x="ds:T",
@@ -351,10 +310,12 @@ if selected_product:
                     )
                 )
                 st.altair_chart(forecast_trends_chart, use_container_width=True)
+                if trends_refinement is not None:
+                    wait_for_refinement(trends_refinement)
 
                 st.write("**Price in USD Forecast**")
                 forecast_price_chart = (
-                    alt.Chart(forecast_price)
+                    alt.Chart(downsample_line(forecast_price, "ds", "yhat"))
                     .mark_line(color="orange")
                     .encode(
                         x="ds:T",
@@ -370,6 +331,8 @@ if selected_product:
                     )
                 )
                 st.altair_chart(forecast_price_chart, use_container_width=True)
+                if price_refinement is not None:
+                    wait_for_refinement(price_refinement)
 
             else:
                 st.warning("Not enough historical data to forecast prices for this product.")
@@ -0,0 +1,125 @@
+import pandas as pd
+
+from fx import convert_to_usd
+
+# ------------------------------------------------------------------------------
+# Batch arbitrage scanner
+#
+# Works on a price snapshot with many products at once (one row per product and
+# market): prices are converted to USD, the base currency of every product is picked
+# with the same USD -> EUR -> HKD rule as the per-product view, and the products are
+# ranked by the spread between their cheapest and most expensive market.
+# ------------------------------------------------------------------------------
+BASE_CURRENCIES = ("USD", "EUR", "HKD")
+
+PRODUCT_KEY = ["brand", "reference_code"]
+
+RANKING_COLUMNS = ["spread_pct", "spread_usd", "discount_vs_base_pct"]
+
+OPPORTUNITY_COLUMNS = PRODUCT_KEY + [
+    "life_span_date", "min_currency", "min_price_usd", "max_currency", "max_price_usd", "n_markets",
+    "base_currency", "base_price_usd"
+] + RANKING_COLUMNS
+
+
+def base_prices(snapshot):
+    """
+    Picks the base price of every product: its USD price if listed in USD, else EUR, else HKD.
+
+    Args:
+        snapshot (pd.DataFrame): Prices with brand, reference_code, currency and price_usd.
+
+    Returns:
+        pd.DataFrame: brand, reference_code, base_currency, base_price_usd; products
+            listed in none of the BASE_CURRENCIES are left out.
+    """
+    # Mapped as plain values: on a categorical currency map() keeps a categorical, which sorts
+    # in category order instead of by priority
+    priority = (
+        snapshot["currency"].astype(object)
+        .map({currency: i for i, currency in enumerate(BASE_CURRENCIES)})
+        .astype("float64")
+    )
+    is_candidate = priority.notna() & snapshot["price_usd"].notna()
+    candidates = snapshot.loc[is_candidate, PRODUCT_KEY + ["currency", "price_usd"]]
+    candidates = candidates.assign(priority=priority).sort_values(PRODUCT_KEY + ["priority"], kind="stable")
+    return (
+        candidates.drop_duplicates(PRODUCT_KEY)
+        .drop(columns="priority")
+        .rename(columns={"currency": "base_currency", "price_usd": "base_price_usd"})
+    )
+
+
+def price_differences(snapshot, rates=None):
+    """
+    Adds the USD price, base price and difference vs. the base price to every row of a snapshot.
+
+    Args:
+        snapshot (pd.DataFrame): Latest prices per product and market.
+        rates: USD rates passed to fx.convert_to_usd(); prices without a rate get no USD price.
+
+    Returns:
+        pd.DataFrame: The snapshot with price_usd, base_currency, base_price_usd and
+            diff_vs_base columns.
+    """
+    snapshot = snapshot.assign(
+        price_usd=convert_to_usd(snapshot, rates=rates, on_unknown="nan", date_col="life_span_date")
+    )
+    snapshot = snapshot.merge(base_prices(snapshot), on=PRODUCT_KEY, how="left")
+    snapshot["diff_vs_base"] = snapshot["price_usd"] - snapshot["base_price_usd"]
+    return snapshot
+
+
+def scan_opportunities(snapshot, rates=None, top_n=50, rank_by="spread_pct"):
+    """
+    Ranks the products of a snapshot by their arbitrage spread.
+
+    Args:
+        snapshot (pd.DataFrame): Latest prices per product and market, as returned by
+            price_data.query_brand_snapshot(). If it has a price_usd column already (e.g.
+            from the arbitrage table), the prices are not converted again.
+        rates: USD rates passed to fx.convert_to_usd(); prices without a rate are ignored.
+        top_n (int): Number of products to return, None for all.
+        rank_by (str): One of RANKING_COLUMNS.
+
+    Returns:
+        pd.DataFrame: One row per product priced in several markets, with its base
+            price, cheapest and most expensive market and the spread between them,
+            widest spread first.
+    """
+    if rank_by not in RANKING_COLUMNS:
+        raise ValueError(f"rank_by must be one of {RANKING_COLUMNS}, got {rank_by!r}")
+
+    if "price_usd" not in snapshot.columns:
+        snapshot = snapshot.assign(
+            price_usd=convert_to_usd(snapshot, rates=rates, on_unknown="nan", date_col="life_span_date")
+        )
+    # Base prices are recomputed on the rows that have a USD price
+    snapshot = snapshot.drop(columns=["base_currency", "base_price_usd", "diff_vs_base"], errors="ignore")
+    snapshot = snapshot.dropna(subset=["price_usd"]).reset_index(drop=True)
+    if snapshot.empty:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    # observed=True: with categorical keys, only the combinations present form groups
+    grouped = snapshot.groupby(PRODUCT_KEY, sort=False, observed=True)["price_usd"]
+    cheapest = snapshot.loc[grouped.idxmin(), PRODUCT_KEY + ["life_span_date", "currency", "price_usd"]]
+    priciest = snapshot.loc[grouped.idxmax(), PRODUCT_KEY + ["currency", "price_usd"]]
+    n_markets = grouped.size().rename("n_markets").reset_index()
+
+    opportunities = (
+        cheapest.rename(columns={"currency": "min_currency", "price_usd": "min_price_usd"})
+        .merge(priciest.rename(columns={"currency": "max_currency", "price_usd": "max_price_usd"}), on=PRODUCT_KEY)
+        .merge(n_markets, on=PRODUCT_KEY)
+        .merge(base_prices(snapshot), on=PRODUCT_KEY)
+    )
+    opportunities["spread_usd"] = opportunities["max_price_usd"] - opportunities["min_price_usd"]
+    opportunities["spread_pct"] = opportunities["spread_usd"] / opportunities["base_price_usd"] * 100
+    # How much cheaper the cheapest market is than the base market
+    opportunities["discount_vs_base_pct"] = (
+        (opportunities["base_price_usd"] - opportunities["min_price_usd"]) / opportunities["base_price_usd"] * 100
+    )
+
+    # A product priced in a single market has no spread to trade
+    opportunities = opportunities[opportunities["n_markets"] > 1]
+    opportunities = opportunities[OPPORTUNITY_COLUMNS].sort_values(rank_by, ascending=False, ignore_index=True)
+    return opportunities if top_n is None else opportunities.head(top_n)
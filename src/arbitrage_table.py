@@ -0,0 +1,150 @@
+import argparse
+import datetime
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from arbitrage import PRODUCT_KEY, price_differences
+from fx import load_rate_table
+from price_snapshot import to_compact_frame
+
+# ------------------------------------------------------------------------------
+# Persisted arbitrage table
+#
+# One row per product and market with the latest snapshot of the product, its USD
+# price, base price and diff_vs_base, stored in a single Parquet file. The latest
+# life_span_date that was loaded (the watermark) is kept in the file's metadata.
+# A refresh only loads the rows on or after the watermark and recomputes the
+# products that appear in them, so its cost follows the new data, not the history.
+# ------------------------------------------------------------------------------
+DEFAULT_TABLE_PATH = "./data/arbitrage_table.parquet"
+
+WATERMARK_KEY = b"watermark"
+
+# A market of a product: later rows for the same market on the same date replace earlier ones
+MARKET_KEY = PRODUCT_KEY + ["country", "currency"]
+
+
+class ArbitrageTable:
+    """
+    Arbitrage table kept up to date incrementally.
+
+    Args:
+        path (str): Parquet file of the table, created by the first refresh.
+    """
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        self.path = path
+        self.watermark = read_arbitrage_watermark(path)
+        self.rows = pq.read_table(path).to_pandas() if os.path.exists(path) else pd.DataFrame()
+
+    def refresh(self, fetch_prices_since, rates=None, full=False):
+        """
+        Brings the table up to date with the price rows that landed since the last refresh.
+
+        Rows of the watermark date itself are loaded again, since a date can land in
+        several loads; the products they touch are merged with their stored snapshot.
+
+        Args:
+            fetch_prices_since (callable): Returns the price rows with life_span_date on or
+                after the given date (all rows for None), e.g. price_data.fetch_prices_since.
+            rates: USD rates passed to fx.convert_to_usd(), defaults to fx.load_rate_table().
+            full (bool): Rebuild from the whole history, e.g. after the exchange rates changed.
+
+        Returns:
+            int: Number of products that were recomputed.
+        """
+        since = None if full or self.rows.empty else self.watermark
+        new_rows = fetch_prices_since(since)
+        if new_rows.empty:
+            return 0
+        # Plain strings and dates, so stored and new rows concatenate and sort alike
+        new_rows = new_rows.astype({name: object for name in MARKET_KEY}).assign(
+            life_span_date=pd.to_datetime(new_rows["life_span_date"]).dt.date
+        )
+
+        affected = new_rows[PRODUCT_KEY].drop_duplicates()
+        if since is None:
+            kept, candidates = self.rows.iloc[:0], new_rows
+        else:
+            is_affected = self._product_index(self.rows).isin(self._product_index(affected))
+            kept = self.rows[~is_affected]
+            # Stored rows go first, so the newly loaded row of a market wins
+            candidates = pd.concat([self.rows.loc[is_affected, new_rows.columns], new_rows], ignore_index=True)
+
+        latest_date = candidates.groupby(PRODUCT_KEY, observed=True)["life_span_date"].transform("max")
+        snapshot = (
+            candidates[candidates["life_span_date"] == latest_date]
+            .drop_duplicates(MARKET_KEY, keep="last")
+            .reset_index(drop=True)
+        )
+        updated = price_differences(snapshot, rates=load_rate_table() if rates is None else rates)
+
+        self.rows = pd.concat([kept, updated], ignore_index=True).sort_values(MARKET_KEY, ignore_index=True)
+        self.watermark = max(d for d in [self.watermark, new_rows["life_span_date"].max()] if d is not None)
+        self._write()
+        return len(affected)
+
+    @staticmethod
+    def _product_index(df):
+        return pd.MultiIndex.from_frame(df[PRODUCT_KEY])
+
+    def _write(self):
+        table = pa.Table.from_pandas(self.rows, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), WATERMARK_KEY: self.watermark.isoformat().encode()
+        })
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Unique temporary name, the apps can refresh the table while the job runs
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def read_arbitrage_watermark(path=DEFAULT_TABLE_PATH):
+    """Returns the latest life_span_date loaded into the arbitrage table, or None without a table."""
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    if WATERMARK_KEY not in metadata:
+        return None
+    return datetime.date.fromisoformat(metadata[WATERMARK_KEY].decode())
+
+
+def read_arbitrage_table(path=DEFAULT_TABLE_PATH, brand=None, reference_code=None):
+    """Reads the rows of a brand (and product) from the arbitrage table, or None without a table."""
+    if not os.path.exists(path):
+        return None
+    filters = []
+    if brand is not None:
+        filters.append(("brand", "=", brand))
+    if reference_code is not None:
+        filters.append(("reference_code", "=", reference_code))
+    return to_compact_frame(pq.read_table(path, filters=filters or None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the arbitrage table with newly loaded prices.")
+    parser.add_argument("--table", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--full", action="store_true", help="Rebuild from the whole price history")
+    args = parser.parse_args()
+
+    # Imported here so reading the table doesn't need the query backends
+    from price_data import fetch_prices_since
+
+    arbitrage_table = ArbitrageTable(args.table)
+    n_products = arbitrage_table.refresh(fetch_prices_since, full=args.full)
+    print(f"Recomputed {n_products} products, table is up to date until {arbitrage_table.watermark}")
+
+
+if __name__ == "__main__":
+    main()
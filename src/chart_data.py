@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Downsampling of time series before charting
+#
+# Altair embeds a chart's data as JSON in the page, so a chart should only carry
+# the columns it encodes and about as many points as the chart has pixels across.
+# Largest-Triangle-Three-Buckets (LTTB) keeps the points that shape the line
+# (peaks, dips, turns); min/max bucketing keeps each bucket's extremes, for
+# series where spikes must never be smoothed away.
+# ------------------------------------------------------------------------------
+
+# About the width of a full-width chart in pixels
+CHART_MAX_POINTS = 1000
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Picks the points of a line with Largest-Triangle-Three-Buckets.
+
+    Args:
+        x (np.ndarray): Increasing x values as floats.
+        y (np.ndarray): y values, without NaNs.
+        n_out (int): Number of points to keep, first and last included.
+
+    Returns:
+        np.ndarray: Positions of the kept points, in order.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the first and the last point, which are always kept
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(int) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < n_out - 3:
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the area of the triangles (last kept point, candidate, average of the next bucket)
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Keeps the lowest and highest point of each bucket of equal size, and the end points.
+
+    Args:
+        y (np.ndarray): y values, without NaNs.
+        n_out (int): Maximum number of points to keep.
+
+    Returns:
+        np.ndarray: Positions of the kept points, in order.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    buckets = pd.Series(y).groupby(np.arange(n) * ((n_out - 2) // 2) // n)
+    return np.unique(np.concatenate([buckets.idxmin().to_numpy(), buckets.idxmax().to_numpy(), [0, n - 1]]))
+
+
+def downsample_line(df, x, y, max_points=CHART_MAX_POINTS, method="lttb"):
+    """
+    Returns the data of a line chart: only its x and y columns, downsampled to max_points.
+
+    Args:
+        df (pd.DataFrame): Series to chart.
+        x (str): Column on the x axis, datetime or numeric.
+        y (str): Column on the y axis.
+        max_points (int): Number of points to keep at most, e.g. the chart width in pixels.
+        method (str): "lttb" to keep the shape of the line, "minmax" to keep every extreme.
+
+    Returns:
+        pd.DataFrame: x and y columns sorted by x, rows without a y dropped.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}, expected one of {DOWNSAMPLING_METHODS}")
+
+    line = df[[x, y]].dropna(subset=[y]).sort_values(x, ignore_index=True)
+    if len(line) <= max_points:
+        return line
+
+    y_values = line[y].to_numpy(dtype="float64")
+    if method == "minmax":
+        return line.iloc[minmax_indices(y_values, max_points)].reset_index(drop=True)
+
+    x_values = line[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype("int64")
+    return line.iloc[lttb_indices(x_values.to_numpy(dtype="float64"), y_values, max_points)].reset_index(drop=True)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Lightweight forecasting with NumPy
+#
+# Damped-trend exponential smoothing (Holt's method with a damped trend) on the
+# series resampled to days. The smoothing parameters are picked by a grid search
+# that runs all candidates at once as arrays, so a forecast takes milliseconds
+# instead of the seconds of a Prophet fit. The output has the columns of a Prophet
+# forecast (ds, yhat, yhat_lower, yhat_upper), history included, so both can be
+# charted the same way.
+# ------------------------------------------------------------------------------
+ALPHAS = np.linspace(0.05, 0.95, 10)
+BETAS = np.linspace(0.01, 0.5, 8)
+DAMPING = 0.98
+
+# Width of the uncertainty interval in standard deviations (80%, as Prophet's default)
+INTERVAL_Z = 1.28
+
+
+def _smooth(y, alpha, beta, phi):
+    # Runs the damped-trend recursions for arrays of parameter candidates at once and
+    # returns the one-step-ahead fits (len(y) x candidates) and the final level and trend
+    level = np.full_like(alpha, y[0])
+    trend = np.full_like(alpha, y[1] - y[0] if len(y) > 1 else 0.0)
+    fitted = np.empty((len(y), len(alpha)))
+    for t, value in enumerate(y):
+        prediction = level + phi * trend
+        fitted[t] = prediction
+        new_level = alpha * value + (1 - alpha) * prediction
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        level = new_level
+    return fitted, level, trend
+
+
+def damped_trend_forecast(series, periods=180, phi=DAMPING):
+    """
+    Forecasts a series with damped-trend exponential smoothing.
+
+    Args:
+        series (pd.DataFrame): Training data with ds and y columns, at least two rows.
+        periods (int): Number of days to forecast past the end of the series.
+        phi (float): Damping of the trend per day, 1 for an undamped linear trend.
+
+    Returns:
+        pd.DataFrame: ds, yhat, yhat_lower, yhat_upper for the history and the forecast days.
+    """
+    daily = (
+        series.assign(ds=pd.to_datetime(series["ds"]))
+        .groupby("ds")["y"].mean()
+        .resample("D").mean()
+        .interpolate()
+    )
+    y = daily.to_numpy(dtype="float64")
+
+    alpha, beta = (grid.ravel() for grid in np.meshgrid(ALPHAS, BETAS))
+    fitted, level, trend = _smooth(y, alpha, beta, phi)
+    # The first step only echoes the initial level, so it is left out of the error
+    sse = ((fitted[1:] - y[1:, None]) ** 2).sum(axis=0)
+    best = np.argmin(sse)
+
+    horizon = np.arange(1, periods + 1)
+    damped_steps = np.cumsum(phi ** horizon)
+    future = level[best] + damped_steps * trend[best]
+
+    # Interval from the one-step errors, widening with the square root of the horizon
+    sigma = np.sqrt(sse[best] / max(len(y) - 1, 1))
+    history_width = np.full(len(y), INTERVAL_Z * sigma)
+    future_width = INTERVAL_Z * sigma * np.sqrt(horizon)
+
+    return pd.DataFrame({
+        "ds": daily.index.append(pd.date_range(daily.index[-1] + pd.Timedelta(days=1), periods=periods)),
+        "yhat": np.concatenate([fitted[:, best], future]),
+        "yhat_lower": np.concatenate([fitted[:, best] - history_width, future - future_width]),
+        "yhat_upper": np.concatenate([fitted[:, best] + history_width, future + future_width])
+    })
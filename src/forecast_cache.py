@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Cache of fitted Prophet models and their forecasts
+#
+# Entries are keyed by a fingerprint of the input series (ds, y) and the model
+# config, so the same series is only fitted once: the most recently used entries
+# are kept in memory and every entry is also written to `cache_dir` (the model with
+# Prophet's JSON serialization, the forecast as Parquet) to survive restarts.
+# Prophet itself is only imported once a model is fitted or loaded.
+# ------------------------------------------------------------------------------
+DEFAULT_CACHE_DIR = "./data/forecast_cache"
+
+
+def series_fingerprint(series, periods, prophet_kwargs):
+    """
+    Hash of a (ds, y) series together with the model config and forecast horizon.
+
+    Args:
+        series (pd.DataFrame): Training data with ds and y columns.
+        periods (int): Number of days forecast.
+        prophet_kwargs (dict): Arguments passed to Prophet().
+
+    Returns:
+        str: Hex digest identifying the fit.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(series[["ds", "y"]], index=False).to_numpy().tobytes())
+    digest.update(json.dumps({"periods": periods, "prophet": prophet_kwargs}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """
+    Fits Prophet models on demand and caches them with their forecasts.
+
+    Args:
+        cache_dir (str): Directory of the persisted entries, None to keep them in memory only.
+        max_entries (int): Number of entries kept in memory, least recently used first out.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=32):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Reentrant: a Future that is already done runs its callback while the lock is held
+        self._lock = threading.RLock()
+        # Background fits run one at a time, so they don't compete with the app for the CPU
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._background = {}
+        # Fits running in any thread, so concurrent requests for the same entry fit it once
+        self._fitting = {}
+        # Errors of failed background fits, so a series that can't be fitted isn't retried forever
+        self._failures = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key):
+        model_path, forecast_path = self._paths(key)
+        if not (os.path.exists(model_path) and os.path.exists(forecast_path)):
+            return None
+        from prophet.serialize import model_from_json
+
+        with open(model_path) as f:
+            model = model_from_json(f.read())
+        return model, pd.read_parquet(forecast_path)
+
+    def _store(self, key, model, forecast):
+        from prophet.serialize import model_to_json
+
+        model_path, forecast_path = self._paths(key)
+        # Written under unique temporary names first, so a crash never leaves a partial
+        # entry and writers of the same entry in other processes don't collide
+        model_fd, model_tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        forecast_fd, forecast_tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(forecast_fd)
+        try:
+            with os.fdopen(model_fd, "w") as f:
+                f.write(model_to_json(model))
+            forecast.to_parquet(forecast_tmp, index=False)
+            os.replace(forecast_tmp, forecast_path)
+            os.replace(model_tmp, model_path)
+        except BaseException:
+            for tmp_path in (model_tmp, forecast_tmp):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._load(key) if self.cache_dir else None
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def lookup(self, series, periods=180, **prophet_kwargs):
+        """Returns the cached (model, forecast) of a series, or None without fitting it."""
+        return self._lookup(series_fingerprint(series, periods, prophet_kwargs))
+
+    def fit_in_background(self, series, periods=180, **prophet_kwargs):
+        """
+        Starts get_or_fit() for a series in a background thread and returns its Future.
+        A series that is already being fitted is not scheduled twice, and a series whose
+        fit failed is not fitted again until clear(): its Future holds the recorded error.
+        """
+        key = series_fingerprint(series, periods, prophet_kwargs)
+        with self._lock:
+            if key in self._failures:
+                future = Future()
+                future.set_exception(self._failures[key])
+                return future
+            future = self._background.get(key)
+            if future is None:
+                future = self._executor.submit(self._fit_in_background, key, series.copy(), periods, prophet_kwargs)
+                self._background[key] = future
+                future.add_done_callback(lambda _: self._forget_background(key))
+        return future
+
+    def _fit_in_background(self, key, series, periods, prophet_kwargs):
+        try:
+            return self.get_or_fit(series, periods, **prophet_kwargs)
+        except Exception as error:
+            # Recorded before the Future completes, so callers that see it done also see the failure
+            with self._lock:
+                self._failures[key] = error
+            raise
+
+    def failure(self, series, periods=180, **prophet_kwargs):
+        """Returns the error of the failed background fit of a series, or None."""
+        with self._lock:
+            return self._failures.get(series_fingerprint(series, periods, prophet_kwargs))
+
+    def _forget_background(self, key):
+        with self._lock:
+            self._background.pop(key, None)
+
+    def get_or_fit(self, series, periods=180, **prophet_kwargs):
+        """
+        Returns the fitted model and forecast for a series, fitting it only on a cache miss.
+        If the series is already being fitted (e.g. in the background), waits for that fit.
+
+        Args:
+            series (pd.DataFrame): Training data with ds and y columns.
+            periods (int): Number of days to forecast past the end of the series.
+            **prophet_kwargs: Model config passed to Prophet().
+
+        Returns:
+            tuple: (Prophet model, forecast DataFrame from model.predict()).
+        """
+        key = series_fingerprint(series, periods, prophet_kwargs)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._remember(key, entry)
+            return entry
+
+        with self._lock:
+            fit = self._fitting.get(key)
+            is_fitting_here = fit is None
+            if is_fitting_here:
+                fit = self._fitting[key] = Future()
+        if not is_fitting_here:
+            return fit.result()
+
+        try:
+            from prophet import Prophet
+
+            model = Prophet(**prophet_kwargs)
+            model.fit(series)
+            forecast = model.predict(model.make_future_dataframe(periods=periods))
+            entry = model, forecast
+            if self.cache_dir:
+                self._store(key, model, forecast)
+            # Remembered before the waiting callers are released, so later lookups hit
+            self._remember(key, entry)
+        except BaseException as error:
+            fit.set_exception(error)
+            raise
+        else:
+            fit.set_result(entry)
+        finally:
+            with self._lock:
+                del self._fitting[key]
+        return entry
+
+    def clear(self):
+        """Drops the in-memory entries and recorded failures; the persisted entries are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
@@ -0,0 +1,191 @@
+import argparse
+import datetime
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from fx import convert_to_usd, load_rate_table
+
+# ------------------------------------------------------------------------------
+# Batch price forecasts
+#
+# run_batch_forecast() fits a Prophet model on the daily average USD price of every
+# reference code in the watch catalogue, in a process pool using all cores, and
+# writes the forecasts with their fit diagnostics to a ForecastStore that app2.py
+# reads instead of fitting in the request path.
+# ------------------------------------------------------------------------------
+DEFAULT_STORE_DIR = "./data/forecast_store"
+WATCH_CATALOGUE_PATH = "./data/watch_catalogue.csv"
+
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+
+def daily_price_series(timeseries, rates=None):
+    """
+    Average USD price per day of a product, the training series of the price forecast.
+
+    Args:
+        timeseries (pd.DataFrame): Price history with life_span_date, currency and price.
+        rates: USD rates passed to fx.convert_to_usd(); prices without a rate are left out.
+
+    Returns:
+        pd.DataFrame: ds and y columns, one row per date.
+    """
+    price_usd = convert_to_usd(timeseries, rates=rates, on_unknown="nan", date_col="life_span_date")
+    return (
+        price_usd.groupby(timeseries["life_span_date"])
+        .mean()
+        .rename_axis("ds")
+        .reset_index(name="y")
+        .dropna(subset=["ds", "y"])
+    )
+
+
+class ForecastStore:
+    """
+    Precomputed price forecasts, one Parquet file for the forecasts of all products and
+    one for their fit diagnostics.
+
+    Args:
+        store_dir (str): Directory of the store.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.forecasts_path = os.path.join(store_dir, "price_forecasts.parquet")
+        self.diagnostics_path = os.path.join(store_dir, "fit_diagnostics.parquet")
+
+    def write(self, forecasts, diagnostics):
+        """Replaces the stored forecasts; both files are swapped in only once both are written."""
+        os.makedirs(os.path.dirname(self.forecasts_path), exist_ok=True)
+        forecasts.to_parquet(self.forecasts_path + ".tmp", index=False)
+        diagnostics.to_parquet(self.diagnostics_path + ".tmp", index=False)
+        os.replace(self.forecasts_path + ".tmp", self.forecasts_path)
+        os.replace(self.diagnostics_path + ".tmp", self.diagnostics_path)
+
+    def load(self, reference_code):
+        """Returns the forecast of a product (ds, yhat, yhat_lower, yhat_upper), or None if not stored."""
+        if not os.path.exists(self.forecasts_path):
+            return None
+        forecast = pq.read_table(
+            self.forecasts_path, columns=FORECAST_COLUMNS, filters=[("reference_code", "=", reference_code)]
+        ).to_pandas()
+        return forecast if len(forecast) else None
+
+    def diagnostics(self):
+        if not os.path.exists(self.diagnostics_path):
+            return None
+        return pd.read_parquet(self.diagnostics_path)
+
+
+def _fit_forecast(reference_code, series, periods):
+    # Runs in a worker process: fits one product and returns (forecast, diagnostics)
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    diagnostics = {
+        "reference_code": reference_code,
+        "n_observations": len(series),
+        "history_start": series["ds"].min(),
+        "history_end": series["ds"].max(),
+        "fit_seconds": np.nan,
+        "mae": np.nan,
+        "mape": np.nan,
+        "error": None
+    }
+    start = time.perf_counter()
+    try:
+        model = Prophet()
+        model.fit(series)
+        forecast = model.predict(model.make_future_dataframe(periods=periods))
+    except Exception as e:
+        diagnostics["error"] = f"{type(e).__name__}: {e}"
+        return None, diagnostics
+
+    diagnostics["fit_seconds"] = time.perf_counter() - start
+    # In-sample error of the fit
+    fitted = forecast["yhat"].to_numpy()[:len(series)]
+    errors = np.abs(fitted - series["y"].to_numpy())
+    diagnostics["mae"] = errors.mean()
+    diagnostics["mape"] = (errors / np.abs(series["y"].to_numpy())).mean() * 100
+    return forecast[FORECAST_COLUMNS].assign(reference_code=reference_code), diagnostics
+
+
+def run_batch_forecast(brand="Tag Heuer", catalogue_path=WATCH_CATALOGUE_PATH, store_dir=DEFAULT_STORE_DIR,
+                       periods=180, workers=None, min_observations=3):
+    """
+    Fits price forecasts for every reference code of the watch catalogue and stores them.
+
+    Args:
+        brand (str): Brand of the catalogue's watches in the price table.
+        catalogue_path (str): CSV with a reference_code column.
+        store_dir (str): Directory of the ForecastStore.
+        periods (int): Number of days to forecast.
+        workers (int): Number of worker processes, defaults to the number of CPUs.
+        min_observations (int): Products with fewer daily prices are skipped.
+
+    Returns:
+        pd.DataFrame: The fit diagnostics, one row per reference code.
+    """
+    # Imported here so reading the store doesn't need the query backends
+    from price_data import fetch_brand_timeseries
+
+    reference_codes = pd.read_csv(catalogue_path)["reference_code"].dropna().unique()
+    timeseries = fetch_brand_timeseries(brand)
+    rates = load_rate_table()
+
+    timeseries_by_code = dict(list(timeseries.groupby("reference_code", sort=False, observed=True)))
+    series_by_code = {}
+    diagnostics = []
+    fitted_at = datetime.datetime.now()
+    for reference_code in reference_codes:
+        product_timeseries = timeseries_by_code.get(reference_code, timeseries.iloc[:0])
+        series = daily_price_series(product_timeseries, rates=rates)
+        if len(series) < min_observations:
+            diagnostics.append({"reference_code": reference_code, "n_observations": len(series),
+                                "error": "not enough history"})
+        else:
+            series_by_code[reference_code] = series
+
+    forecasts = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_fit_forecast, reference_code, series, periods)
+            for reference_code, series in series_by_code.items()
+        ]
+        for i, future in enumerate(futures, 1):
+            forecast, fit_diagnostics = future.result()
+            if forecast is not None:
+                forecasts.append(forecast)
+            diagnostics.append(fit_diagnostics)
+            print(f"Fitted {i}/{len(futures)} products", end="\r")
+
+    diagnostics = pd.DataFrame(diagnostics).assign(fitted_at=fitted_at)
+    forecasts = pd.concat(forecasts, ignore_index=True) if forecasts else pd.DataFrame(
+        columns=FORECAST_COLUMNS + ["reference_code"]
+    )
+    ForecastStore(store_dir).write(forecasts, diagnostics)
+    return diagnostics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute price forecasts for every catalogue watch.")
+    parser.add_argument("--brand", default="Tag Heuer")
+    parser.add_argument("--catalogue", default=WATCH_CATALOGUE_PATH)
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    parser.add_argument("--periods", type=int, default=180, help="Days to forecast")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    diagnostics = run_batch_forecast(args.brand, args.catalogue, args.store_dir, periods=args.periods,
+                                     workers=args.workers)
+    n_fitted = diagnostics["error"].isna().sum()
+    print(f"\nStored forecasts for {n_fitted} of {len(diagnostics)} reference codes in {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
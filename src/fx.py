@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Currency conversion to USD, shared by the apps
+#
+# Rates are USD per unit of currency. A rate table has one row per (date, currency)
+# with the rate that applies from that date on, so a price is converted with the
+# latest rate published on or before its own date (an as-of join). Without a rate
+# file the static USD_RATES below apply to every date.
+# ------------------------------------------------------------------------------
+USD_RATES = {
+    'USD': 1.00,
+    'CHF': 1.10,
+    'CNY': 0.15,
+    'EUR': 1.08,
+    'GBP': 1.24,
+    'HKD': 0.13,
+    'JPY': 0.0074,
+    'SGD': 0.75,
+    'TWD': 0.033,
+    'AED': 0.27,
+    'KRW': 0.00076
+}
+
+# Optional CSV with columns date,currency,usd_rate
+FX_RATES_FILE = os.environ.get("FX_RATES_FILE", "./data/fx_rates.csv")
+
+RATE_TABLE_COLUMNS = ["date", "currency", "usd_rate"]
+
+
+class UnknownCurrencyError(ValueError):
+    """Raised when prices are in a currency (or on a date) without a known rate."""
+
+    def __init__(self, currencies):
+        self.currencies = sorted(currencies)
+        super().__init__(f"No USD rate for: {', '.join(self.currencies)}")
+
+
+def static_rate_table(rates=USD_RATES):
+    """Rate table applying `rates` to every date."""
+    return pd.DataFrame({
+        "date": pd.Timestamp("1900-01-01"),
+        "currency": list(rates),
+        "usd_rate": list(rates.values())
+    })
+
+
+def load_rate_table(path=FX_RATES_FILE):
+    """
+    Loads a dated rate table from a CSV, or the static rates if the file doesn't exist.
+
+    Args:
+        path (str): CSV with columns date, currency, usd_rate.
+
+    Returns:
+        pd.DataFrame or dict: Rate table sorted by date, or USD_RATES without a file, so
+            convert_to_usd() maps the rates directly instead of joining on dates.
+    """
+    if not os.path.exists(path):
+        return USD_RATES
+    rate_table = pd.read_csv(path, usecols=RATE_TABLE_COLUMNS, parse_dates=["date"])
+    return rate_table.sort_values("date", ignore_index=True)
+
+
+def convert_to_usd(df, rates=None, on_unknown="raise", price_col="price", currency_col="currency",
+                   date_col=None):
+    """
+    Converts a column of prices to USD in one vectorized operation.
+
+    Args:
+        df (pd.DataFrame): Prices with a currency column and, for dated rates, a date column.
+        rates (dict or pd.DataFrame): Currency -> USD rate, or a dated rate table (see
+            load_rate_table(), in any order). Defaults to USD_RATES.
+        on_unknown (str): 'raise' to raise UnknownCurrencyError for prices without a rate,
+            'nan' to leave their USD price empty.
+        price_col (str): Column with the prices.
+        currency_col (str): Column with the currency codes.
+        date_col (str): Column with the price dates, required for a dated rate table.
+
+    Returns:
+        pd.Series: USD prices, aligned with `df`.
+    """
+    if on_unknown not in ("raise", "nan"):
+        raise ValueError(f"on_unknown must be 'raise' or 'nan', got {on_unknown!r}")
+    if rates is None:
+        rates = USD_RATES
+
+    if isinstance(rates, dict):
+        # Categorical currencies map to a categorical, hence the cast
+        usd_rate = df[currency_col].map(rates).astype("float64")
+    else:
+        if date_col is None:
+            raise ValueError("A dated rate table needs the date_col of the prices")
+        # merge_asof needs both sides sorted by date; the row position restores the order
+        prices = pd.DataFrame({
+            "date": pd.to_datetime(df[date_col]).to_numpy(dtype="datetime64[ns]"),
+            "currency": df[currency_col].to_numpy(),
+            "position": np.arange(len(df))
+        }).astype({"currency": str})
+        # Prices without a date can't be matched to a rate, they are left without one
+        prices = prices[prices["date"].notna()].sort_values("date", kind="stable")
+        # The "by" keys need identical dtypes on both sides
+        rates = rates.astype({"date": "datetime64[ns]", "currency": str}).sort_values("date", kind="stable")
+        merged = pd.merge_asof(prices, rates, on="date", by="currency", direction="backward")
+        usd_rate = np.full(len(df), np.nan)
+        usd_rate[merged["position"].to_numpy()] = merged["usd_rate"].to_numpy(dtype="float64")
+        usd_rate = pd.Series(usd_rate, index=df.index)
+
+    missing = usd_rate.isna() & df[currency_col].notna()
+    if on_unknown == "raise" and missing.any():
+        raise UnknownCurrencyError(set(df.loc[missing, currency_col]))
+    return (df[price_col] * usd_rate).rename(f"{price_col}_usd")
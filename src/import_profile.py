@@ -0,0 +1,107 @@
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+# ------------------------------------------------------------------------------
+# Import-time profile of the Streamlit entry points
+#
+# Runs the module-level imports of every entry point in a fresh interpreter with
+# `python -X importtime`, reports the slowest modules and checks each entry point
+# against its cold start budget and the list of modules that must stay lazy.
+# Exits with status 1 when a check fails, so it can guard CI (make check-startup).
+# ------------------------------------------------------------------------------
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cold start budget of the imports of each entry point, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "streamlit-app.py": 1500,
+    "app.py": 2500,
+    "app2.py": 2500,
+    "top-opportunities-app.py": 2500,
+    "watchfinder-app.py": 4000
+}
+
+# Heavy dependencies that are only needed on some code paths and must be imported there
+LAZY_MODULES = ("prophet", "cmdstanpy", "google.cloud.bigquery")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def module_level_imports(path):
+    """Returns the source of the import statements at the top level of a script."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile_imports(path):
+    """
+    Imports the module-level dependencies of a script in a fresh interpreter.
+
+    Args:
+        path (str): Entry point script.
+
+    Returns:
+        list: (module, self ms, cumulative ms, depth) per imported module, in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", module_level_imports(path)],
+        cwd=os.path.dirname(path), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the dependencies of {path} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def check_entry_point(name, budget_ms, top=10):
+    """Prints the import profile of an entry point and returns the list of failed checks."""
+    modules = profile_imports(os.path.join(SRC_DIR, name))
+    # Top-level entries are the ones the script imports itself; their cumulative times add up
+    total_ms = sum(cumulative for _, _, cumulative, depth in modules if depth == 0)
+    print(f"\n{name}: {total_ms:.0f} ms for {len(modules)} modules (budget {budget_ms} ms)")
+    for module, _, cumulative, _ in sorted(modules, key=lambda m: -m[2])[:top]:
+        print(f"  {cumulative:8.1f} ms  {module}")
+
+    failures = []
+    if total_ms > budget_ms:
+        failures.append(f"{name}: imports take {total_ms:.0f} ms, budget is {budget_ms} ms")
+    imported = {module for module, _, _, _ in modules}
+    for lazy_module in LAZY_MODULES:
+        if lazy_module in imported:
+            failures.append(f"{name}: {lazy_module} is imported at startup")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile and check the import time of the Streamlit apps.")
+    parser.add_argument("entry_points", nargs="*", default=list(IMPORT_BUDGETS_MS),
+                        help="Scripts in src/ to check, defaults to all entry points")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Overrides the budget of every entry point")
+    args = parser.parse_args()
+
+    failures = []
+    for name in args.entry_points:
+        budget_ms = args.budget_ms or IMPORT_BUDGETS_MS.get(name, max(IMPORT_BUDGETS_MS.values()))
+        failures.extend(check_entry_point(name, budget_ms, top=args.top))
+
+    if failures:
+        print("\nStartup checks failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll startup checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from arbitrage import price_differences
+from arbitrage_table import ArbitrageTable, DEFAULT_TABLE_PATH, read_arbitrage_table, read_arbitrage_watermark
+from fx import load_rate_table
+from price_snapshot import DEFAULT_SNAPSHOT_DIR, LocalPriceStore, to_compact_frame
+from single_flight import SingleFlight
+
+# ------------------------------------------------------------------------------
+# Shared data access for the price-monitoring-2022 table
+#
+# Every query function is cached per (function, parameters) with st.cache_data, so
+# reruns (e.g. from toggling a widget) and other sessions asking for the same
+# selection are served from memory instead of running a new BigQuery job.
+# Entries expire after QUERY_CACHE_TTL seconds and the least recently used ones
+# are evicted beyond QUERY_CACHE_MAX_ENTRIES per function (identical misses wait on
+# the one running query). The BigQuery client is created once per process, and the
+# uncached fetch_* feeds share one BigQuery job between identical concurrent calls.
+#
+# With PRICE_DATA_BACKEND=local the queries are answered from the local Parquet
+# snapshot in PRICE_SNAPSHOT_DIR (see price_snapshot.py) instead, which needs no
+# GCP credentials.
+# ------------------------------------------------------------------------------
+PRICE_TABLE = "`edhec-business-manageme.luxurydata2502.price-monitoring-2022`"
+
+QUERY_CACHE_TTL = 600  # seconds
+QUERY_CACHE_MAX_ENTRIES = 256
+
+PRICE_DATA_BACKENDS = ("bigquery", "local")
+PRICE_DATA_BACKEND = os.environ.get("PRICE_DATA_BACKEND", "bigquery")
+PRICE_SNAPSHOT_DIR = os.environ.get("PRICE_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+ARBITRAGE_TABLE_PATH = os.environ.get("ARBITRAGE_TABLE_PATH", DEFAULT_TABLE_PATH)
+
+if PRICE_DATA_BACKEND not in PRICE_DATA_BACKENDS:
+    raise ValueError(f"PRICE_DATA_BACKEND must be one of {PRICE_DATA_BACKENDS}, got {PRICE_DATA_BACKEND!r}")
+
+
+@st.cache_resource
+def get_client():
+    # One client per process, shared by all sessions and reruns (it is thread-safe).
+    # Imported on first use, so the local backend never loads the BigQuery client
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
+    # Credentials via Streamlit secrets
+    credentials = service_account.Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"]
+    )
+    return bigquery.Client(credentials=credentials, project=credentials.project_id)
+
+
+def run_query(sql, **params):
+    """
+    Runs a query with named parameters and returns the result as a DataFrame.
+
+    Values are passed as BigQuery query parameters (`@name` in the SQL) instead of
+    being formatted into the string, so identical queries share BigQuery's result
+    cache and user input can't change the query. Results are downloaded as Arrow
+    through the BigQuery Storage Read API and converted with compact dtypes (see
+    price_snapshot.to_compact_frame()).
+
+    Args:
+        sql (str): Query text referring to parameters as @name.
+        **params: String parameter values by name.
+
+    Returns:
+        pd.DataFrame: The query result.
+    """
+    from google.cloud import bigquery
+
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter(name, "STRING", value) for name, value in params.items()
+    ])
+    # Falls back to the REST API if google-cloud-bigquery-storage is not installed
+    table = get_client().query(sql, job_config=job_config).to_arrow(create_bqstorage_client=True)
+    return to_compact_frame(table)
+
+
+@st.cache_resource
+def get_query_flights():
+    return SingleFlight()
+
+
+def run_shared_query(sql, **params):
+    """
+    run_query() for the uncached feeds: concurrent calls with the same query and
+    parameters run a single job, and every caller receives its own copy of the result.
+    (The st.cache_data queries need no such layer, Streamlit already runs identical
+    concurrent cache misses once.)
+    """
+    key = (sql, tuple(sorted(params.items())))
+    return get_query_flights().do(key, lambda: run_query(sql, **params)).copy()
+
+
+@st.cache_resource
+def get_local_store():
+    return LocalPriceStore(PRICE_SNAPSHOT_DIR)
+
+
+def use_local_store():
+    return PRICE_DATA_BACKEND == "local"
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_brands():
+    if use_local_store():
+        return get_local_store().brands()
+    return run_query(f"""
+    SELECT DISTINCT brand
+    FROM {PRICE_TABLE}
+    ORDER BY brand
+    """)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_products(brand):
+    if use_local_store():
+        return get_local_store().products(brand)
+    return run_query(f"""
+    SELECT DISTINCT reference_code
+    FROM {PRICE_TABLE}
+    WHERE brand = @brand
+    ORDER BY reference_code
+    """, brand=brand)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_latest_snapshot(brand, reference_code):
+    """
+    Returns the prices of a product on the latest date it was monitored, in a single job.
+    The date is in the `life_span_date` column; the result is empty if the product has no data.
+    """
+    if use_local_store():
+        return get_local_store().latest_snapshot(brand, reference_code)
+    return run_query(f"""
+    SELECT
+      reference_code,
+      brand,
+      life_span_date,
+      country,
+      currency,
+      price
+    FROM {PRICE_TABLE}
+    WHERE brand = @brand
+      AND reference_code = @reference_code
+    QUALIFY life_span_date = MAX(life_span_date) OVER ()
+    """, brand=brand, reference_code=reference_code)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_brand_snapshot(brand=None):
+    """
+    Returns the latest prices of every product of a brand (or of all brands if None),
+    each product on its own latest monitored date, in a single job.
+    """
+    if use_local_store():
+        return get_local_store().brand_snapshot(brand)
+    return run_query(f"""
+    SELECT
+      reference_code,
+      brand,
+      life_span_date,
+      country,
+      currency,
+      price
+    FROM {PRICE_TABLE}
+    WHERE @brand IS NULL OR brand = @brand
+    QUALIFY life_span_date = MAX(life_span_date) OVER (PARTITION BY brand, reference_code)
+    """, brand=brand)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_timeseries(brand, reference_code):
+    if use_local_store():
+        return get_local_store().timeseries(brand, reference_code)
+    return run_query(f"""
+    SELECT
+      life_span_date,
+      currency,
+      price
+    FROM {PRICE_TABLE}
+    WHERE brand = @brand
+      AND reference_code = @reference_code
+    ORDER BY life_span_date
+    """, brand=brand, reference_code=reference_code)
+
+
+def fetch_prices_since(since=None):
+    """
+    Returns all price rows with a life_span_date on or after `since` (a date, or None
+    for the whole table). Not cached: it feeds the arbitrage table refresh job.
+    """
+    if use_local_store():
+        return get_local_store().prices_since(since)
+    return run_shared_query(f"""
+    SELECT
+      reference_code,
+      brand,
+      life_span_date,
+      country,
+      currency,
+      price
+    FROM {PRICE_TABLE}
+    WHERE @since IS NULL OR life_span_date >= CAST(@since AS DATE)
+    """, since=None if since is None else since.isoformat())
+
+
+def fetch_brand_timeseries(brand):
+    """Returns the full price history of every product of a brand. Not cached: it feeds batch jobs."""
+    if use_local_store():
+        return get_local_store().brand_timeseries(brand)
+    return run_shared_query(f"""
+    SELECT
+      reference_code,
+      life_span_date,
+      currency,
+      price
+    FROM {PRICE_TABLE}
+    WHERE brand = @brand
+    ORDER BY reference_code, life_span_date
+    """, brand=brand)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_arbitrage_snapshot(brand=None, reference_code=None):
+    """
+    Returns the latest prices of a product, a brand or all brands from the arbitrage
+    table (see arbitrage_table.py), with price_usd, base_currency, base_price_usd and
+    diff_vs_base precomputed. Falls back to the price table queries, computing the
+    same columns, while no arbitrage table has been built or it doesn't have the
+    product or brand yet.
+    """
+    rows = read_arbitrage_table(ARBITRAGE_TABLE_PATH, brand=brand, reference_code=reference_code)
+    if rows is not None and not rows.empty:
+        return rows
+    if reference_code is not None:
+        snapshot = query_latest_snapshot(brand, reference_code)
+    else:
+        snapshot = query_brand_snapshot(brand)
+    return price_differences(snapshot, rates=load_rate_table())
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def query_latest_price_date():
+    """Returns the latest life_span_date in the price table (a date), or None if it is empty."""
+    if use_local_store():
+        return get_local_store().latest_date()
+    latest_date = run_query(f"""
+    SELECT MAX(life_span_date) AS latest_date
+    FROM {PRICE_TABLE}
+    """)["latest_date"].iloc[0]
+    return None if pd.isna(latest_date) else pd.Timestamp(latest_date).date()
+
+
+def arbitrage_table_date():
+    """Returns the latest price date loaded into the arbitrage table, or None without a table."""
+    return read_arbitrage_watermark(ARBITRAGE_TABLE_PATH)
+
+
+@st.cache_resource
+def get_arbitrage_table_lock():
+    return threading.Lock()
+
+
+def refresh_arbitrage_table():
+    """
+    Brings the arbitrage table up to date if the price table has newer dates than its
+    watermark, loading only the new rows (see ArbitrageTable.refresh()). Does nothing
+    while no table has been built with `make refresh-arbitrage-table`.
+
+    Returns:
+        int: Number of products that were recomputed.
+    """
+    if not os.path.exists(ARBITRAGE_TABLE_PATH):
+        return 0
+    # One refresh at a time per process, however many sessions press the button
+    with get_arbitrage_table_lock():
+        latest_date = query_latest_price_date()
+        watermark = arbitrage_table_date()
+        if latest_date is None or (watermark is not None and watermark >= latest_date):
+            return 0
+        n_products = ArbitrageTable(ARBITRAGE_TABLE_PATH).refresh(fetch_prices_since)
+    query_arbitrage_snapshot.clear()
+    return n_products
+
+
+QUERY_FUNCTIONS = [
+    query_brands, query_products, query_latest_snapshot, query_brand_snapshot, query_arbitrage_snapshot,
+    query_timeseries, query_latest_price_date
+]
+
+
+def invalidate_query_cache(*functions):
+    """
+    Drops cached query results, e.g. after new data has been loaded into the table.
+    Without arguments every query function is cleared, and the local snapshot is reopened.
+    """
+    if not functions:
+        get_local_store.clear()
+    for function in functions or QUERY_FUNCTIONS:
+        function.clear()
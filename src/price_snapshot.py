@@ -0,0 +1,171 @@
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Local copy of the price-monitoring-2022 table, written as Parquet files partitioned
+# by brand (data/price_snapshot/brand=<brand>/part-0.parquet). With it the apps can run
+# without BigQuery: set PRICE_DATA_BACKEND=local (see price_data.py).
+DEFAULT_SNAPSHOT_DIR = "./data/price_snapshot"
+
+SNAPSHOT_COLUMNS = ["reference_code", "brand", "life_span_date", "country", "currency", "price"]
+
+BRAND_PARTITIONING = ds.partitioning(pa.schema([("brand", pa.string())]), flavor="hive")
+
+# Low-cardinality string columns, returned as categoricals
+DICTIONARY_COLUMNS = ("brand", "reference_code", "country", "currency")
+# Columns returned as float32 when every value keeps its cents
+FLOAT32_COLUMNS = ("price",)
+
+
+def to_compact_frame(table):
+    """
+    Converts query results to a memory-compact DataFrame.
+
+    Low-cardinality strings become categoricals (from Arrow dictionary arrays), dates
+    become datetime64 instead of Python objects, and prices become float32 when that
+    loses no cents.
+
+    Args:
+        table (pa.Table): Query results.
+
+    Returns:
+        pd.DataFrame: The results with compact dtypes.
+    """
+    for name in DICTIONARY_COLUMNS:
+        if name in table.column_names and not pa.types.is_dictionary(table.schema.field(name).type):
+            table = table.set_column(table.column_names.index(name), name, pc.dictionary_encode(table[name]))
+    df = table.to_pandas(date_as_object=False)
+
+    for name in FLOAT32_COLUMNS:
+        if name in df.columns and df[name].dtype == "float64":
+            values = df[name].to_numpy()
+            compact = values.astype("float32")
+            if np.nanmax(np.abs(compact - values), initial=0) < 0.005:
+                df[name] = compact
+    return df
+
+
+def write_snapshot(table, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    Writes the price table as a brand-partitioned Parquet dataset.
+
+    The dataset is written next to `snapshot_dir` and swapped in when complete, so
+    readers never see a half-written snapshot.
+
+    Args:
+        table (pa.Table): Rows of the price table with the SNAPSHOT_COLUMNS.
+        snapshot_dir (str): Directory of the snapshot, replaced if it exists.
+    """
+    snapshot_dir = os.path.normpath(snapshot_dir)
+    tmp_dir = snapshot_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    # Sorted within each brand, so row group statistics let reads skip most of the file
+    table = table.sort_by([("reference_code", "ascending"), ("life_span_date", "ascending")])
+    ds.write_dataset(table, tmp_dir, format="parquet", partitioning=BRAND_PARTITIONING,
+                     basename_template="part-{i}.parquet")
+
+    old_dir = snapshot_dir + ".old"
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, old_dir)
+    os.replace(tmp_dir, snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def sync_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Downloads the price table from BigQuery into a local snapshot and returns its row count."""
+    # Imported here so the local backend doesn't need the BigQuery client
+    from price_data import PRICE_TABLE, get_client
+
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    table = get_client().query(f"SELECT {columns} FROM {PRICE_TABLE}").to_arrow()
+    write_snapshot(table, snapshot_dir)
+    return table.num_rows
+
+
+class LocalPriceStore:
+    """
+    Answers the apps' price queries from a local snapshot instead of BigQuery.
+
+    Lookups for a brand only open that brand's partition, and the brand list comes
+    from the partition directories alone, so every query runs in milliseconds.
+
+    Args:
+        snapshot_dir (str): Directory written by write_snapshot() or sync_snapshot().
+    """
+
+    def __init__(self, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+        if not os.path.isdir(snapshot_dir):
+            raise FileNotFoundError(
+                f"No price snapshot in {snapshot_dir}, create one with `python src/price_snapshot.py`"
+            )
+        self.dataset = ds.dataset(snapshot_dir, format="parquet", partitioning=BRAND_PARTITIONING)
+
+    def _read(self, columns, brand=None, reference_code=None):
+        condition = None
+        if brand is not None:
+            condition = ds.field("brand") == brand
+        if reference_code is not None:
+            condition = condition & (ds.field("reference_code") == reference_code)
+        return self.dataset.to_table(columns=columns, filter=condition)
+
+    def brands(self):
+        brands = {
+            ds.get_partition_keys(fragment.partition_expression)["brand"]
+            for fragment in self.dataset.get_fragments()
+        }
+        return to_compact_frame(pa.table({"brand": sorted(brands)}))
+
+    def products(self, brand):
+        table = self._read(["reference_code"], brand)
+        reference_codes = pc.unique(table["reference_code"]).drop_null()
+        reference_codes = reference_codes.take(pc.sort_indices(reference_codes))
+        return to_compact_frame(pa.table({"reference_code": reference_codes}))
+
+    def latest_snapshot(self, brand, reference_code):
+        table = self._read(SNAPSHOT_COLUMNS, brand, reference_code)
+        if table.num_rows:
+            table = table.filter(pc.equal(table["life_span_date"], pc.max(table["life_span_date"])))
+        return to_compact_frame(table)
+
+    def brand_snapshot(self, brand=None):
+        table = self._read(SNAPSHOT_COLUMNS, brand)
+        latest = table.group_by(["brand", "reference_code"]).aggregate([("life_span_date", "max")])
+        table = table.join(latest, keys=["brand", "reference_code"])
+        table = table.filter(pc.equal(table["life_span_date"], table["life_span_date_max"]))
+        return to_compact_frame(table.select(SNAPSHOT_COLUMNS))
+
+    def prices_since(self, since=None):
+        table = self.dataset.to_table(
+            columns=SNAPSHOT_COLUMNS, filter=None if since is None else ds.field("life_span_date") >= since
+        )
+        return to_compact_frame(table)
+
+    def latest_date(self):
+        """Returns the latest life_span_date in the snapshot, or None if it is empty."""
+        return pc.max(self._read(["life_span_date"])["life_span_date"]).as_py()
+
+    def brand_timeseries(self, brand):
+        table = self._read(["reference_code", "life_span_date", "currency", "price"], brand)
+        return to_compact_frame(table.sort_by([("reference_code", "ascending"), ("life_span_date", "ascending")]))
+
+    def timeseries(self, brand, reference_code):
+        table = self._read(["life_span_date", "currency", "price"], brand, reference_code)
+        return to_compact_frame(table.sort_by("life_span_date"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the BigQuery price table into a local Parquet snapshot.")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    n_rows = sync_snapshot(args.snapshot_dir)
+    print(f"Wrote {n_rows} rows to {args.snapshot_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future
+
+# ------------------------------------------------------------------------------
+# Single-flight execution of identical concurrent calls
+#
+# While a call for a key is running, further calls for the same key from other
+# threads (e.g. other Streamlit sessions) don't start their own: they wait for
+# the running one and all receive its result, or its exception. Once it finishes
+# the key is forgotten, so later calls run again. Every caller receives the same
+# result object, so callers that may modify it should copy it.
+# ------------------------------------------------------------------------------
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs), unless a call for the same key is already in flight.
+
+        Args:
+            key: Hashable identity of the call, e.g. the query text and its parameters.
+            fn (callable): Computes the result.
+
+        Returns:
+            The result of the call, the same object for every caller it was shared with.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Future()
+        if not is_leader:
+            return call.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result
@@ -1,8 +1,9 @@
 import streamlit as st
 
 app2 = st.Page("app2.py", title="Arbitrage Finder", icon="💰")
+top_opportunities_app = st.Page("top-opportunities-app.py", title="Top Opportunities", icon="🏆")
 watchfinder_app = st.Page("watchfinder-app.py", title="Watchfinder.com Scraper", icon="⌚")
 
-pg = st.navigation([app2, watchfinder_app])
+pg = st.navigation([app2, top_opportunities_app, watchfinder_app])
 st.set_page_config(page_title="Luxury Watch", page_icon="⌚")
 pg.run()
\ No newline at end of file
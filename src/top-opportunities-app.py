@@ -0,0 +1,81 @@
+import streamlit as st
+import altair as alt
+
+from arbitrage import RANKING_COLUMNS, scan_opportunities
+from fx import load_rate_table
+from price_data import arbitrage_table_date, query_arbitrage_snapshot, query_brands
+
+ALL_BRANDS = "All brands"
+
+RANKING_LABELS = {
+    "spread_pct": "Spread in % of base price",
+    "spread_usd": "Spread in USD",
+    "discount_vs_base_pct": "Discount vs. base currency in %"
+}
+
+# ------------------------------------------------------------------------------
+# App Title & Description
+# ------------------------------------------------------------------------------
+st.title("Top Arbitrage Opportunities")
+st.write(
+    """
+    Scans every product of a brand at once and ranks them by the spread between their cheapest and most
+    expensive market on the latest monitored date. Prices are converted to USD; the base currency of each
+    product is USD, else EUR, else HKD, as in the Arbitrage Finder.
+    """
+)
+
+# ------------------------------------------------------------------------------
+# Scan Settings
+# ------------------------------------------------------------------------------
+brands_df = query_brands()
+brand_options = [ALL_BRANDS] + brands_df["brand"].dropna().unique().tolist()
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    selected_brand = st.selectbox("Brand", brand_options)
+with col2:
+    rank_by = st.selectbox("Rank by", RANKING_COLUMNS, format_func=RANKING_LABELS.get)
+with col3:
+    top_n = st.number_input("Number of products", min_value=5, max_value=500, value=25, step=5)
+
+# ------------------------------------------------------------------------------
+# Ranked Opportunities
+# ------------------------------------------------------------------------------
+snapshot_df = query_arbitrage_snapshot(None if selected_brand == ALL_BRANDS else selected_brand)
+opportunities_df = scan_opportunities(snapshot_df, rates=load_rate_table(), top_n=int(top_n), rank_by=rank_by)
+table_date = arbitrage_table_date()
+if table_date is not None:
+    st.caption(f"Prices as of {table_date:%Y-%m-%d} (arbitrage table, updated by make refresh-arbitrage-table)")
+
+if opportunities_df.empty:
+    st.info("No product with prices in several markets and a base currency.")
+else:
+    chart = (
+        alt.Chart(opportunities_df)
+        .mark_bar()
+        .encode(
+            x=alt.X(f"{rank_by}:Q", title=RANKING_LABELS[rank_by]),
+            y=alt.Y("reference_code:N", sort="-x", title="Reference Code"),
+            color=alt.Color("brand:N", title="Brand"),
+            tooltip=["brand", "reference_code", "min_currency", "max_currency", "spread_usd", "spread_pct"]
+        )
+        .properties(height=max(300, 20 * len(opportunities_df)))
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    st.dataframe(opportunities_df.rename(columns={
+        "brand": "Brand",
+        "reference_code": "Reference Code",
+        "life_span_date": "Date",
+        "min_currency": "Cheapest Market",
+        "min_price_usd": "Cheapest Price (USD)",
+        "max_currency": "Most Expensive Market",
+        "max_price_usd": "Most Expensive Price (USD)",
+        "n_markets": "Markets",
+        "base_currency": "Base Currency",
+        "base_price_usd": "Base Price (USD)",
+        "spread_pct": "Spread (%)",
+        "spread_usd": "Spread (USD)",
+        "discount_vs_base_pct": "Discount vs. Base (%)"
+    }), use_container_width=True)
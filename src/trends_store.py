@@ -0,0 +1,182 @@
+import argparse
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Google Trends exports
+#
+# A directory of CSVs as exported from trends.google.com:
+#    1st row: "Category: All categories"
+#    2nd row: empty
+#    3rd row: "Day,Audemars Piguet: (Worldwide)"
+#    4th row onward: "2024-11-19,56", ...
+# The brand of a file is read from its header, so adding a brand is just adding an
+# export. Files are only parsed when their brand is requested, and parsed again
+# only when their content changed.
+# ------------------------------------------------------------------------------
+DEFAULT_TRENDS_DIR = "./data"
+TRENDS_FILE_PATTERN = "multiTimeline*.csv"
+
+
+def read_trends_brand(path):
+    """Returns the brand of a trends export from its header ("Day,Tag Heuer: (Worldwide)")."""
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            if line.startswith("Day,") or line.startswith("Week,"):
+                return line.split(",", 1)[1].rsplit(":", 1)[0].strip()
+    return None
+
+
+def parse_trends_csv(path):
+    """
+    Parses a trends export into a compact frame.
+
+    Returns:
+        pd.DataFrame: date (datetime64) and trend (float32, "<1" counts as 0) columns.
+    """
+    df = pd.read_csv(path, skiprows=1, header=0, encoding="utf-8-sig")
+    df = df.rename(columns={df.columns[0]: "date", df.columns[1]: "trend"})
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["trend"] = pd.to_numeric(df["trend"].replace("<1", 0), errors="coerce").astype("float32")
+    return df.dropna(subset=["date"]).reset_index(drop=True)
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class TrendsStore:
+    """
+    Serves the Google Trends series per brand from a directory of exports.
+
+    Parsed series are cached in memory. A file whose mtime changed is hashed, and
+    only parsed again if its content differs from the cached one.
+
+    Args:
+        trends_dir (str): Directory of the exports.
+        pattern (str): Glob pattern of the export files in `trends_dir`.
+    """
+
+    def __init__(self, trends_dir=DEFAULT_TRENDS_DIR, pattern=TRENDS_FILE_PATTERN):
+        self.trends_dir = trends_dir
+        self.pattern = pattern
+        self._lock = threading.Lock()
+        self._brand_files = {}
+        self._listing = None
+        # path -> (mtime_ns, content hash, parsed frame)
+        self._series = {}
+
+    def _index(self):
+        # Maps brands to files, reading only the headers of files that are new or changed
+        paths = sorted(glob.glob(os.path.join(self.trends_dir, self.pattern)))
+        listing = tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+        if listing != self._listing:
+            brand_files = {}
+            for path in paths:
+                brand = read_trends_brand(path)
+                if brand:
+                    brand_files[brand] = path
+            self._brand_files, self._listing = brand_files, listing
+        return self._brand_files
+
+    def brands(self):
+        """Returns the brands with a trends export."""
+        with self._lock:
+            return sorted(self._index())
+
+    def load(self, brand):
+        """Returns the trends series of a brand (date, trend), or None without an export."""
+        with self._lock:
+            path = self._index().get(brand)
+            if path is None:
+                return None
+
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = self._series.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[2]
+
+            content_hash = _file_hash(path)
+            if cached is not None and cached[1] == content_hash:
+                series = cached[2]
+            else:
+                series = parse_trends_csv(path)
+            self._series[path] = (mtime_ns, content_hash, series)
+            return series
+
+
+def write_trends_csv(path, brand, series):
+    """Writes a (date, trend) series in the format of a trends export, atomically."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("Category: All categories\n\n")
+        f.write(f"Day,{brand}: (Worldwide)\n")
+        for date, trend in zip(series["date"], series["trend"]):
+            f.write(f"{date:%Y-%m-%d},{trend:g}\n")
+    os.replace(path + ".tmp", path)
+
+
+def fetch_google_trends(brand, timeframe="today 3-m"):
+    """Downloads the daily interest of a brand from Google Trends as a (date, trend) frame."""
+    from pytrends.request import TrendReq
+
+    pytrends = TrendReq()
+    pytrends.build_payload([brand], timeframe=timeframe)
+    interest = pytrends.interest_over_time()
+    return pd.DataFrame({"date": interest.index, "trend": interest[brand].to_numpy()})
+
+
+def refresh_trends(brands, trends_dir=DEFAULT_TRENDS_DIR, fetch=fetch_google_trends):
+    """
+    Pulls new trends data for brands and merges it into their exports.
+
+    Dates already in an export are overwritten by the new values, older dates are kept.
+    Brands without an export get a new file.
+
+    Args:
+        brands (list): Brands to refresh.
+        trends_dir (str): Directory of the exports.
+        fetch (callable): Returns the (date, trend) frame of a brand, by default from
+            Google Trends; pass e.g. TrendsStore(other_dir).load to refresh from local files.
+    """
+    store = TrendsStore(trends_dir)
+    brand_files = store._index()
+    for brand in brands:
+        new_series = fetch(brand)
+        if new_series is None or new_series.empty:
+            print(f"No trends data for {brand}")
+            continue
+        path = brand_files.get(brand) or os.path.join(trends_dir, f"multiTimeline-{brand.replace(' ', '')}.csv")
+        series = pd.concat([store.load(brand), new_series]) if brand in brand_files else new_series
+        series = (
+            series.assign(date=pd.to_datetime(series["date"]))
+            .drop_duplicates("date", keep="last")
+            .sort_values("date")
+        )
+        write_trends_csv(path, brand, series)
+        print(f"Wrote {len(series)} days of trends for {brand} to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the Google Trends exports of brands.")
+    parser.add_argument("--brands", default=None,
+                        help="Comma-separated brands to refresh, defaults to all brands with an export")
+    parser.add_argument("--trends-dir", default=DEFAULT_TRENDS_DIR)
+    parser.add_argument("--stand-in", default=None, metavar="DIR",
+                        help="Take the new data from the exports in DIR instead of Google Trends")
+    args = parser.parse_args()
+
+    fetch = TrendsStore(args.stand_in).load if args.stand_in else fetch_google_trends
+    if args.brands:
+        brands = [brand.strip() for brand in args.brands.split(",") if brand.strip()]
+    else:
+        brands = TrendsStore(args.trends_dir).brands()
+    refresh_trends(brands, args.trends_dir, fetch=fetch)
+
+
+if __name__ == "__main__":
+    main()
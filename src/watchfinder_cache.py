@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def content_hash(data):
+    """Returns the SHA-256 hex digest of a str or bytes object."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    # Write to a temporary file first so a crash never leaves a half-written file behind
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class PageCache:
+    """
+    Content-addressed on-disk cache of raw HTTP responses.
+
+    Layout of `cache_dir`:
+        bodies/<sha256 of body>       raw response bodies, shared by identical pages
+        index/<sha256 of url>.json    url, body hash, ETag and Last-Modified of the last response
+        parsed/<sha256 of body>.json  extracted watch data of a body, so unchanged pages
+                                      don't have to be parsed again
+
+    Args:
+        cache_dir (str): Directory the cache lives in, created if missing.
+    """
+
+    def __init__(self, cache_dir='scraper_cache'):
+        self.cache_dir = cache_dir
+        for subdir in ('bodies', 'index', 'parsed'):
+            os.makedirs(os.path.join(cache_dir, subdir), exist_ok=True)
+
+    def _path(self, subdir, name):
+        return os.path.join(self.cache_dir, subdir, name)
+
+    def lookup(self, url):
+        """Returns the index entry of `url`, or None if its body is not cached."""
+        try:
+            with open(self._path('index', content_hash(url) + '.json')) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self._path('bodies', entry['body_hash'])):
+            return None
+        return entry
+
+    def conditional_headers(self, url):
+        """Builds If-None-Match / If-Modified-Since headers to revalidate a cached page."""
+        entry = self.lookup(url)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load_body(self, url):
+        """Returns the cached body of `url`, or None if it is not cached."""
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        with open(self._path('bodies', entry['body_hash']), 'rb') as f:
+            return f.read()
+
+    def store(self, url, response):
+        """Stores the body and validators of a successful response and returns the body hash."""
+        body_hash = content_hash(response.content)
+        body_path = self._path('bodies', body_hash)
+        if not os.path.exists(body_path):
+            _write_atomic(body_path, response.content)
+
+        entry = {
+            'url': url,
+            'body_hash': body_hash,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        }
+        _write_atomic(self._path('index', content_hash(url) + '.json'), json.dumps(entry).encode('utf-8'))
+        return body_hash
+
+    def load_parsed(self, body):
+        """Returns the watch data previously extracted from `body`, or None."""
+        try:
+            with open(self._path('parsed', content_hash(body) + '.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def store_parsed(self, body, watch_data):
+        _write_atomic(self._path('parsed', content_hash(body) + '.json'), json.dumps(watch_data).encode('utf-8'))
+
+
+class ScrapeJournal:
+    """
+    Append-only JSON lines journal of a scrape, so an interrupted run can resume.
+
+    The journal records item links as the listing crawl discovers them, and marks the
+    end of the crawl. A new run with the same journal skips the listing crawl if it
+    had finished; the watches that are already done are known from the part files of
+    the StreamingResultsWriter.
+
+    Args:
+        path (str): Location of the journal file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.links = []
+        self.listing_done = False
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-write can leave a truncated last line
+                        continue
+                    if record['type'] == 'links':
+                        self.links.extend(record['links'])
+                    elif record['type'] == 'listing_done':
+                        self.listing_done = True
+
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def _append(self, record):
+        # Listing crawlers record links from several threads
+        with self._lock:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+    def record_links(self, links):
+        links = list(links)
+        if links:
+            self.links.extend(links)
+            self._append({'type': 'links', 'links': links})
+
+    def record_listing_done(self):
+        self.listing_done = True
+        self._append({'type': 'listing_done'})
+
+    def close(self):
+        self._file.close()
+
+    def finish(self):
+        """Closes and removes the journal once the results have been written."""
+        self.close()
+        os.remove(self.path)
@@ -0,0 +1,202 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+
+from watchfinder_cache import PageCache
+from watchfinder_fetcher import DEFAULT_PER_HOST_RATE, AsyncPageFetcher
+from watchfinder_frontier import CrawlFrontier
+from watchfinder_parser import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, clean_watch_frame, parse_watch_page
+from watchfinder_queue import SQLiteWorkQueue, delete_queue
+from watchfinder_scraper import (
+    TAG_HEUER_COLLECTIONS, WATCHFINDER_URL, crawl_listings, flatten_watch_data, resolve_url
+)
+from watchfinder_writer import StreamingResultsWriter, merge_part_files
+
+# Distributed mode of the watchfinder scraper:
+#   1. a coordinator crawls the listing pages and pushes item URLs into a SQLiteWorkQueue,
+#   2. any number of workers (on any node that can reach the queue file) lease URLs,
+#      scrape them and write their rows to their own partition directory,
+#   3. merge_partitions() combines all partitions into watchfinder_scraping_results.csv
+#      and removes them.
+# Every run starts from an empty queue: start the coordinator first, then the workers.
+
+
+def run_coordinator(queue_path, collections=TAG_HEUER_COLLECTIONS, n_drivers=3, block_resources=False,
+                    base_url=None):
+    """
+    Starts a new run: empties the queue, crawls the listing pages and pushes every item
+    URL into the queue as it is found. The listing is only marked done if the crawl
+    succeeded, otherwise the crawl's error is raised and workers keep waiting.
+    """
+    queue = SQLiteWorkQueue(queue_path)
+    queue.reset()
+    frontier = CrawlFrontier()
+    collection_urls = [f'{WATCHFINDER_URL}/Tag%20Heuer/{collection}/watches' for collection in collections]
+    crawl_errors = []
+
+    def crawl():
+        try:
+            crawl_listings(collection_urls, frontier, n_drivers=n_drivers, block_resources=block_resources,
+                           base_url=base_url)
+        except Exception as e:
+            crawl_errors.append(e)
+        finally:
+            frontier.finish()
+
+    crawl_thread = threading.Thread(target=crawl, daemon=True)
+    crawl_thread.start()
+    # The queue's connection belongs to this thread, so links are pushed from here
+    for links in frontier.batches(100):
+        queue.push([WATCHFINDER_URL + link for link in links])
+    crawl_thread.join()
+    if crawl_errors:
+        queue.close()
+        raise RuntimeError('Listing crawl failed, rerun the scrape.') from crawl_errors[0]
+
+    queue.mark_listing_done()
+    print(f'Coordinator done: queued {len(frontier)} watch links.')
+    queue.close()
+
+
+def run_worker(queue_path, output_dir, worker_id=None, batch_size=50, concurrency=8,
+               parser=DEFAULT_PARSER_BACKEND, cache_dir='scraper_cache', base_url=None, poll_interval=5,
+               per_host_rate=DEFAULT_PER_HOST_RATE):
+    """
+    Leases item URLs from the queue until it is finished and writes the scraped rows to
+    `output_dir/partitions/<worker_id>/`. URLs are only marked done once their rows are
+    on disk, so a worker that dies loses nothing but its current batch, which is handed
+    to another worker when the lease expires.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+    queue = SQLiteWorkQueue(queue_path)
+    writer = StreamingResultsWriter(None, parts_dir=os.path.join(output_dir, 'partitions', worker_id),
+                                    batch_size=batch_size, transform=clean_watch_frame)
+    cache = PageCache(cache_dir) if cache_dir else None
+    fetcher = AsyncPageFetcher(concurrency=concurrency, per_host_rate=per_host_rate, cache=cache)
+
+    while True:
+        urls = queue.lease(worker_id, batch_size)
+        if not urls:
+            if queue.is_finished():
+                break
+            # The coordinator is still crawling, or other workers hold the remaining leases
+            time.sleep(poll_interval)
+            continue
+
+        done = []
+        fetch_urls = {resolve_url(url, base_url): url for url in urls}
+        for fetch_url, content in fetcher.fetch_all(fetch_urls):
+            url = fetch_urls[fetch_url]
+            if content is None:
+                queue.fail(worker_id, url, 'fetch failed')
+                continue
+            try:
+                watch_data = cache.load_parsed(content) if cache else None
+                if watch_data is None:
+                    watch_data = parse_watch_page(content, backend=parser)
+                    if cache:
+                        cache.store_parsed(content, watch_data)
+            except Exception as e:
+                queue.fail(worker_id, url, f'parse:{type(e).__name__}')
+                continue
+            writer.write(flatten_watch_data(url, watch_data))
+            done.append(url)
+
+        writer.flush()
+        queue.complete(worker_id, done)
+
+    fetcher.close()
+    queue.close()
+    print(f'Worker {worker_id} done: wrote {writer.rows_written} rows.')
+
+
+def merge_partitions(output_dir, output_format='csv'):
+    """
+    Combines the partitions of all workers into the usual results file and returns its path.
+    The partitions are removed afterwards, so the next run doesn't merge them again.
+    """
+    partitions_dir = os.path.join(output_dir, 'partitions')
+    part_files = sorted(glob.glob(os.path.join(partitions_dir, '*', 'part-*.csv')))
+    output_file = os.path.join(output_dir, f'watchfinder_scraping_results.{output_format}')
+    merge_part_files(part_files, output_file, output_format)
+    print(f'Merged {len(part_files)} partition files into {output_file}')
+    shutil.rmtree(partitions_dir, ignore_errors=True)
+    return output_file
+
+
+def run_local(queue_path, output_dir, workers=4, base_url=None, **worker_options):
+    """
+    Runs the coordinator and `workers` worker processes on this machine, then merges.
+    The run starts from a fresh queue and partition directory and removes both once merged.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # Cleared before any process starts, so no worker sees the finished queue of a previous run
+    delete_queue(queue_path)
+    shutil.rmtree(os.path.join(output_dir, 'partitions'), ignore_errors=True)
+
+    coordinator = multiprocessing.Process(target=run_coordinator, args=(queue_path,), kwargs={'base_url': base_url})
+    worker_processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(queue_path, output_dir),
+            kwargs=dict(worker_options, worker_id=f'{socket.gethostname()}-{i}', base_url=base_url)
+        )
+        for i in range(workers)
+    ]
+    for process in [coordinator] + worker_processes:
+        process.start()
+    coordinator.join()
+    if coordinator.exitcode != 0:
+        # The listing is incomplete, so the workers would wait for it forever
+        for process in worker_processes:
+            process.terminate()
+            process.join()
+        raise RuntimeError('Listing crawl failed, rerun the scrape.')
+    for process in worker_processes:
+        process.join()
+
+    queue = SQLiteWorkQueue(queue_path)
+    print(f'Queue status: {queue.counts()}')
+    queue.close()
+    output_file = merge_partitions(output_dir)
+    delete_queue(queue_path)
+    return output_file
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Scrape watchfinder.com with several worker processes.')
+    arg_parser.add_argument('--queue', default='scraper_output/work_queue.sqlite', help='Path of the shared queue')
+    arg_parser.add_argument('--output-dir', default='scraper_output')
+    arg_parser.add_argument('--base-url', default=None)
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('coordinator', help='Crawl listings and fill the queue')
+    worker_parser = subparsers.add_parser('worker', help='Scrape URLs from the queue')
+    worker_parser.add_argument('--worker-id', default=None)
+    worker_parser.add_argument('--concurrency', type=int, default=8)
+    worker_parser.add_argument('--per-host-rate', type=float, default=DEFAULT_PER_HOST_RATE,
+                               help='Maximum requests per second of this worker (0: no limit)')
+    worker_parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND)
+    subparsers.add_parser('merge', help='Combine all partitions into the results CSV')
+    run_parser = subparsers.add_parser('run', help='Coordinator, workers and merge on this machine')
+    run_parser.add_argument('--workers', type=int, default=4)
+
+    args = arg_parser.parse_args()
+    os.makedirs(os.path.dirname(args.queue) or '.', exist_ok=True)
+    if args.command == 'coordinator':
+        run_coordinator(args.queue, base_url=args.base_url)
+    elif args.command == 'worker':
+        run_worker(args.queue, args.output_dir, worker_id=args.worker_id, concurrency=args.concurrency,
+                   parser=args.parser, base_url=args.base_url, per_host_rate=args.per_host_rate)
+    elif args.command == 'merge':
+        merge_partitions(args.output_dir)
+    else:
+        run_local(args.queue, args.output_dir, workers=args.workers, base_url=args.base_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Requests per second to watchfinder.com; replay runs against a local server can pass 0
+DEFAULT_PER_HOST_RATE = 4.0
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host so that no host receives more than
+    `rate` requests per second, regardless of how many fetches are in flight.
+    """
+
+    def __init__(self, rate):
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        if not self.min_interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncPageFetcher:
+    """
+    Fetches many pages concurrently with asyncio.
+
+    Requests go through a shared requests.Session so connections are pooled and
+    kept alive between pages. The blocking calls run on a thread pool sized to
+    `concurrency`, and each host is rate limited separately.
+
+    Args:
+        concurrency (int): Maximum number of requests in flight.
+        per_host_rate (float): Maximum requests per second to a single host (0 disables).
+        retries (int): Number of retries after the first failed attempt.
+        backoff (float): Base delay in seconds for exponential backoff between retries.
+        timeout (float): Per-request timeout in seconds.
+        cache (PageCache): Optional on-disk cache. Cached pages are revalidated with
+            ETag/Last-Modified and served from disk when the server answers 304.
+        metrics (ScrapeMetrics): Optional metrics receiving fetch times, pages, bytes,
+            cache hits, retries and failures by type.
+    """
+
+    def __init__(self, concurrency=8, per_host_rate=DEFAULT_PER_HOST_RATE, retries=3, backoff=0.5, timeout=20, cache=None,
+                 metrics=None):
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.pages_fetched = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.elapsed = 0.0
+
+    def _get(self, url):
+        # Runs on the thread pool, so the cache's disk I/O stays off the event loop too
+        if self.cache is None:
+            response = self.session.get(url, timeout=self.timeout)
+            return response.status_code, response.content
+
+        response = self.session.get(url, headers=self.cache.conditional_headers(url), timeout=self.timeout)
+        if response.status_code == 304:
+            return 304, self.cache.load_body(url)
+        if response.ok:
+            self.cache.store(url, response)
+        return response.status_code, response.content
+
+    def _record(self, name, amount=1, **labels):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount, **labels)
+
+    async def _fetch_one(self, url, executor, limiter):
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.retries + 1):
+            await limiter.wait(host)
+            start = time.perf_counter()
+            try:
+                status_code, content = await loop.run_in_executor(executor, self._get, url)
+            except requests.RequestException as e:
+                status_code, content = None, None
+                error = type(e).__name__
+            finally:
+                if self.metrics is not None:
+                    self.metrics.add_stage_time('fetch', time.perf_counter() - start)
+
+            if status_code == 304 and content is not None:
+                self.cache_hits += 1
+                self._record('cache_hits', kind='http')
+                return content
+            if status_code is not None and 200 <= status_code < 300:
+                self._record('pages_fetched')
+                self._record('bytes_fetched', len(content))
+                return content
+            if status_code is not None:
+                error = f'HTTP {status_code}'
+                if status_code not in RETRY_STATUS_CODES:
+                    break
+
+            if attempt < self.retries:
+                self._record('retries', type=error)
+                # Exponential backoff with jitter so retries don't arrive in lockstep
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+
+        self._record('failures', type=error)
+        print(f'Failed to fetch {url}: {error}')
+        return None
+
+    async def fetch_all_async(self, urls):
+        limiter = HostRateLimiter(self.per_host_rate)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            tasks = [self._fetch_one(url, executor, limiter) for url in urls]
+            return await asyncio.gather(*tasks)
+
+    def fetch_all(self, urls):
+        """
+        Fetches every URL and returns a list of (url, content) tuples in the same
+        order as `urls`. `content` is the raw response body, or None if the page
+        could not be fetched after all retries.
+        """
+        urls = list(urls)
+        start = time.perf_counter()
+        contents = asyncio.run(self.fetch_all_async(urls))
+        self.elapsed += time.perf_counter() - start
+
+        for content in contents:
+            if content is None:
+                self.failures += 1
+            else:
+                self.pages_fetched += 1
+
+        return list(zip(urls, contents))
+
+    @property
+    def pages_per_second(self):
+        return self.pages_fetched / self.elapsed if self.elapsed else 0.0
+
+    def close(self):
+        self.session.close()
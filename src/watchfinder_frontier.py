@@ -0,0 +1,64 @@
+import queue
+import threading
+
+
+class CrawlFrontier:
+    """
+    Thread-safe frontier between the listing crawl and the item page fetches.
+
+    Listing crawlers add the item links they discover; links are deduplicated as
+    they arrive and new ones are queued right away, so item pages can be fetched
+    while listing pages are still being rendered. Consumers read the queue in
+    batches until the crawl is marked as finished and the queue is drained.
+
+    Args:
+        seen_links (iterable): Links that are already known (e.g. from a journal) and
+            must not be queued again.
+    """
+
+    _DONE = object()
+
+    def __init__(self, seen_links=()):
+        self._seen = set(seen_links)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+
+    def add(self, links):
+        """Queues the links not seen before and returns them."""
+        new_links = []
+        with self._lock:
+            for link in links:
+                if link not in self._seen:
+                    self._seen.add(link)
+                    new_links.append(link)
+        for link in new_links:
+            self._queue.put(link)
+        return new_links
+
+    def finish(self):
+        """Marks the listing crawl as done, so batches() stops once the queue is empty."""
+        self._queue.put(self._DONE)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
+
+    def batches(self, batch_size):
+        """
+        Yields lists of up to `batch_size` new links. Blocks until at least one link is
+        available, but never waits to fill a batch, so fetching starts as early as possible.
+        """
+        done = False
+        while not done:
+            batch = [self._queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._DONE in batch:
+                batch.remove(self._DONE)
+                done = True
+            if batch:
+                yield batch
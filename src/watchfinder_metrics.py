@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (in ms) of the parse time histogram buckets
+PARSE_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key):
+    if not label_key:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in label_key) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+class ScrapeMetrics:
+    """
+    Thread-safe per-stage timers, counters and histograms of a scrape.
+
+    Stages are timed with `with metrics.stage('fetch'):`, counters are incremented with
+    optional labels (e.g. `metrics.increment('failures', type='HTTP 503')`) and
+    values such as parse times are observed into histograms. The collected metrics
+    can be written as a JSON run report and as a Prometheus text-format file.
+
+    Args:
+        prefix (str): Prefix of every metric name in the Prometheus output.
+    """
+
+    def __init__(self, prefix='watchfinder'):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.stage_seconds = {}
+        self.stage_calls = {}
+        self.histograms = {}
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=PARSE_MS_BUCKETS):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(buckets)
+            self.histograms[name].observe(value)
+
+    def add_stage_time(self, stage, seconds):
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + 1
+
+    @contextmanager
+    def stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - start)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self.counters.get((name, _label_key(labels)), 0)
+
+    def counter_total(self, name):
+        """Sum of a counter over all its labels."""
+        with self._lock:
+            # Copied under the lock, crawler threads may be adding keys meanwhile
+            counters = list(self.counters.items())
+        return sum(value for (counter_name, _), value in counters if counter_name == name)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def report(self):
+        """Returns all metrics as a JSON-serializable dict."""
+        with self._lock:
+            counters = {}
+            for (name, label_key), value in sorted(self.counters.items()):
+                if label_key:
+                    counters.setdefault(name, {})[','.join(f'{k}={v}' for k, v in label_key)] = value
+                else:
+                    counters[name] = value
+
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                histograms[name] = {
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 3),
+                    'mean': round(histogram.sum / histogram.count, 3) if histogram.count else None,
+                    'buckets': {str(upper): count for upper, count in zip(histogram.buckets, histogram.cumulative_counts())}
+                }
+
+            return {
+                'started_at': self.started_at,
+                'elapsed_seconds': round(self.elapsed, 3),
+                'stages': {
+                    stage: {'seconds': round(seconds, 3), 'calls': self.stage_calls[stage]}
+                    for stage, seconds in self.stage_seconds.items()
+                },
+                'counters': counters,
+                'histograms': histograms
+            }
+
+    def prometheus_text(self):
+        """Renders all metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines.append(f'# TYPE {p}_elapsed_seconds gauge')
+            lines.append(f'{p}_elapsed_seconds {self.elapsed:.3f}')
+
+            lines.append(f'# TYPE {p}_stage_seconds_total counter')
+            for stage, seconds in self.stage_seconds.items():
+                lines.append(f'{p}_stage_seconds_total{{stage="{stage}"}} {seconds:.6f}')
+            lines.append(f'# TYPE {p}_stage_calls_total counter')
+            for stage, calls in self.stage_calls.items():
+                lines.append(f'{p}_stage_calls_total{{stage="{stage}"}} {calls}')
+
+            typed = set()
+            for (name, label_key), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f'# TYPE {p}_{name}_total counter')
+                    typed.add(name)
+                lines.append(f'{p}_{name}_total{_format_labels(label_key)} {value}')
+
+            for name, histogram in self.histograms.items():
+                lines.append(f'# TYPE {p}_{name} histogram')
+                for upper, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    lines.append(f'{p}_{name}_bucket{{le="{upper}"}} {count}')
+                lines.append(f'{p}_{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f'{p}_{name}_sum {histogram.sum:.3f}')
+                lines.append(f'{p}_{name}_count {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path, prometheus_path):
+        with open(json_path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(prometheus_path, 'w') as f:
+            f.write(self.prometheus_text())
+
+
+class ProgressReporter:
+    """
+    Prints a one-line progress and throughput summary at most every `interval` seconds,
+    instead of printing every scraped record.
+    """
+
+    def __init__(self, metrics, interval=10.0):
+        self.metrics = metrics
+        self.interval = interval
+        self._last_print = time.perf_counter()
+
+    def summary(self):
+        m = self.metrics
+        watches = m.counter('watches_scraped')
+        elapsed = m.elapsed
+        return (f'{watches} watches scraped in {elapsed:.0f}s ({watches / elapsed if elapsed else 0:.2f}/s) - '
+                f'{m.counter("pages_fetched")} pages fetched, {m.counter("bytes_fetched") / 1e6:.1f} MB, '
+                f'{m.counter("cache_hits", kind="http")} not modified, {m.counter("cache_hits", kind="parsed")} parses skipped, '
+                f'{m.counter_total("failures")} failures')
+
+    def update(self, force=False):
+        now = time.perf_counter()
+        if force or now - self._last_print >= self.interval:
+            self._last_print = now
+            print(self.summary())
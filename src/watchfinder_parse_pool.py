@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from watchfinder_parser import DEFAULT_PARSER_BACKEND, parse_watch_page
+
+
+def _parse_chunk(pages, backend):
+    """
+    Worker side of ParsePool: parses a chunk of (url, raw html) pairs.
+
+    Returns one compact tuple per page instead of nested dicts, which keeps the
+    results cheap to pickle back to the main process:
+        (url, model, reference code, price, spec names, spec values, parse ms, error)
+    """
+    rows = []
+    for url, html in pages:
+        start = time.perf_counter()
+        try:
+            watch_data = parse_watch_page(html, backend=backend)
+        except Exception as e:
+            rows.append((url, None, None, None, (), (), (time.perf_counter() - start) * 1000, type(e).__name__))
+            continue
+        specs = watch_data['Specifications']
+        rows.append((
+            url, watch_data['Model'], watch_data['Reference Code'], watch_data['Price'],
+            tuple(specs), tuple(specs.values()), (time.perf_counter() - start) * 1000, None
+        ))
+    return rows
+
+
+def row_to_watch_data(row):
+    """Converts a compact row from _parse_chunk back into the dict parse_watch_page returns."""
+    _, model, reference_code, price, spec_names, spec_values, _, _ = row
+    return {
+        "Model": model,
+        "Reference Code": reference_code,
+        "Price": price,
+        "Specifications": dict(zip(spec_names, spec_values))
+    }
+
+
+class ParsePool:
+    """
+    Parses item pages in a pool of worker processes, so parsing uses every core and
+    runs decoupled from the I/O stage that fetches the pages.
+
+    Raw page bytes are handed over as they are (no decoding or soup building in the
+    main process), grouped into chunks of `chunk_size` pages per task. At most
+    `max_pending` chunks are queued; submit() blocks on the oldest chunk when the
+    queue is full, so fetched pages can't pile up in memory faster than they are
+    parsed.
+
+    Args:
+        workers (int): Number of worker processes, defaults to the number of CPUs.
+        backend (str): Parser backend passed to parse_watch_page().
+        chunk_size (int): Pages per task sent to a worker.
+        max_pending (int): Maximum number of chunks queued or being parsed.
+    """
+
+    def __init__(self, workers=None, backend=DEFAULT_PARSER_BACKEND, chunk_size=8, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.workers
+        # Not forked: the pool starts while the crawl thread, Chrome drivers and fetcher
+        # threads run, and a forked child can deadlock on a lock one of them held
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(start_method)
+        )
+        self._pending = deque()
+        self._chunk = []
+
+    def _submit_chunk(self):
+        if self._chunk:
+            self._pending.append(self._executor.submit(_parse_chunk, self._chunk, self.backend))
+            self._chunk = []
+
+    def _collect(self, block_until):
+        # Returns the rows of every finished chunk at the front of the queue, waiting for
+        # chunks while more than `block_until` are pending
+        rows = []
+        while self._pending and (len(self._pending) > block_until or self._pending[0].done()):
+            rows.extend(self._pending.popleft().result())
+        return rows
+
+    def submit(self, url, html):
+        """Queues a page for parsing and returns the rows of all chunks finished so far, in order."""
+        self._chunk.append((url, html))
+        if len(self._chunk) >= self.chunk_size:
+            self._submit_chunk()
+        return self._collect(block_until=self.max_pending)
+
+    def drain(self):
+        """Parses whatever is still queued and returns the remaining rows."""
+        self._submit_chunk()
+        return self._collect(block_until=0)
+
+    def close(self):
+        self._executor.shutdown()
@@ -0,0 +1,275 @@
+import importlib.util
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+# Parser backends for parse_watch_page(). 'soup' builds a full BeautifulSoup tree and is
+# the reference implementation; 'lxml' and 'selectolax' only query the few nodes needed.
+# selectolax is optional (pip install selectolax) and only offered when it is installed.
+PARSER_BACKENDS = tuple(
+    backend for backend in ('lxml', 'selectolax', 'soup')
+    if backend != 'selectolax' or importlib.util.find_spec('selectolax') is not None
+)
+DEFAULT_PARSER_BACKEND = 'lxml'
+
+PRICE_CLASS = 'h2 bold reduced-padding'
+DISCOUNT_PRICE_CLASS = 'h2 bold reduced-padding with-saving'
+
+def extract_watch_data(soup):
+    # Extract Model and Reference Code
+    model = soup.find('meta', {'itemprop': 'model'}).get('content', 'N/A')
+    reference_code = soup.find('meta', {'itemprop': 'mpn'}).get('content', 'N/A')
+
+    # Extract Price
+    price_span = soup.find('span', {'class': PRICE_CLASS})
+    price = price_span.text.strip() if price_span else 'N/A'
+
+    # If no regular price, check for discounted price
+    if price == 'N/A':
+        discount_price_span = soup.find('span', {'class': DISCOUNT_PRICE_CLASS})
+        price = discount_price_span.text.strip() if discount_price_span else 'N/A'
+
+    # Extract Specifications
+    specs_table = soup.find('div', {'id': 'specification-content'}).find('table')
+    specifications = {}
+
+    # Loop through each row of the table
+    for row in specs_table.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) == 2:
+            name = cols[0].text.strip().replace(':', '')
+            value = cols[1].text.strip()
+            specifications[name] = value
+
+    # Display the extracted data
+    watch_data = {
+        "Model": model,
+        "Reference Code": reference_code,
+        "Price": price,
+        "Specifications": specifications
+    }
+
+    return watch_data
+
+def _build_watch_data(model, reference_code, price, discount_price, spec_rows):
+    # Shared tail of the fast-path extractors, mirroring extract_watch_data()
+    if price == 'N/A':
+        price = discount_price() if discount_price else 'N/A'
+
+    specifications = {}
+    for cols in spec_rows:
+        if len(cols) == 2:
+            name = cols[0].strip().replace(':', '')
+            value = cols[1].strip()
+            specifications[name] = value
+
+    return {
+        "Model": model,
+        "Reference Code": reference_code,
+        "Price": price,
+        "Specifications": specifications
+    }
+
+def _extract_with_lxml(html):
+    from lxml import html as lxml_html
+
+    root = lxml_html.fromstring(html)
+
+    def first(xpath):
+        nodes = root.xpath(xpath)
+        return nodes[0] if nodes else None
+
+    model = first("//meta[@itemprop='model']/@content")
+    reference_code = first("//meta[@itemprop='mpn']/@content")
+
+    price_span = first(f"//span[@class='{PRICE_CLASS}']")
+    price = price_span.text_content().strip() if price_span is not None else 'N/A'
+
+    def discount_price():
+        span = first(f"//span[@class='{DISCOUNT_PRICE_CLASS}']")
+        return span.text_content().strip() if span is not None else 'N/A'
+
+    specs_table = first("//div[@id='specification-content']//table")
+    spec_rows = []
+    if specs_table is not None:
+        for row in specs_table.iter('tr'):
+            spec_rows.append([td.text_content() for td in row.iter('td')])
+
+    return _build_watch_data(
+        'N/A' if model is None else str(model),
+        'N/A' if reference_code is None else str(reference_code),
+        price, discount_price, spec_rows
+    )
+
+def _extract_with_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+
+    def meta_content(itemprop):
+        node = tree.css_first(f'meta[itemprop="{itemprop}"]')
+        if node is None:
+            return 'N/A'
+        return node.attributes.get('content', 'N/A')
+
+    def span_text(css_class):
+        node = tree.css_first(f'span[class="{css_class}"]')
+        return node.text().strip() if node is not None else 'N/A'
+
+    specs_table = tree.css_first('#specification-content table')
+    spec_rows = []
+    if specs_table is not None:
+        for row in specs_table.css('tr'):
+            spec_rows.append([td.text() for td in row.css('td')])
+
+    return _build_watch_data(
+        meta_content('model'),
+        meta_content('mpn'),
+        span_text(PRICE_CLASS),
+        lambda: span_text(DISCOUNT_PRICE_CLASS),
+        spec_rows
+    )
+
+def _extract_with_soup(html):
+    return extract_watch_data(BeautifulSoup(html, 'html.parser'))
+
+def parse_watch_page(html, backend=DEFAULT_PARSER_BACKEND):
+    """
+    Extracts the watch data straight from the raw HTML of an item page.
+
+    The 'lxml' and 'selectolax' backends skip building a BeautifulSoup tree and only
+    query the meta tags, price span and specification table that extract_watch_data()
+    reads. They return exactly the same dict.
+
+    Args:
+        html (bytes or str): Raw HTML of a watchfinder.com item page.
+        backend (str): One of PARSER_BACKENDS.
+
+    Returns:
+        dict: Model, Reference Code, Price and Specifications of the watch.
+    """
+    if backend == 'lxml':
+        return _extract_with_lxml(html)
+    if backend == 'selectolax':
+        return _extract_with_selectolax(html)
+    if backend == 'soup':
+        return _extract_with_soup(html)
+    raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+
+# Patterns used to normalize scraped text, compiled once for every record and batch
+MM_PATTERN = re.compile(r'\bMM\b')
+METRES_PATTERN = re.compile(r'\bmetres\b')
+LINE_BREAK_PATTERN = re.compile(r'[\r\n]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PRICE_SYMBOLS_PATTERN = re.compile(r'[$,]')
+
+def clean_text(text):
+    # Lowercase "MM"
+    text = MM_PATTERN.sub('mm', text)
+    # Convert "metres" to "m"
+    text = METRES_PATTERN.sub('m', text)
+    # Remove \r and \n
+    text = LINE_BREAK_PATTERN.sub('', text)
+    # Remove extra whitespaces
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
+    return text
+
+def clean_watch_data(watch_data_dict):
+    # Clean Model and Reference Code
+    watch_data_dict['Model'] = clean_text(watch_data_dict.get('Model', 'N/A'))
+    watch_data_dict['Reference Code'] = clean_text(watch_data_dict.get('Reference Code', 'N/A'))
+    watch_data_dict['Price'] = clean_text(watch_data_dict.get('Price', 'N/A'))
+    # Remove dollar sign and comma thousands separator from Price
+    watch_data_dict['Price'] = PRICE_SYMBOLS_PATTERN.sub('', watch_data_dict['Price'])
+    
+    # Clean Specifications
+    cleaned_specs = {}
+    for key, value in watch_data_dict.get('Specifications', {}).items():
+        cleaned_key = clean_text(key)
+        cleaned_value = clean_text(value)
+        cleaned_specs[cleaned_key] = cleaned_value
+        
+    watch_data_dict['Specifications'] = cleaned_specs
+    
+    return watch_data_dict
+
+# Joins the cells of a batch so every pattern runs once over one string. It is not a
+# word character or whitespace, so \b and \s+ behave exactly as on the separate cells.
+CELL_SEPARATOR = '\x00'
+
+def _clean_text_bulk(values):
+    joined = CELL_SEPARATOR.join(values)
+    if joined.count(CELL_SEPARATOR) != len(values) - 1:
+        # A cell contains the separator itself, fall back to cleaning cell by cell
+        return [clean_text(value) for value in values]
+
+    joined = MM_PATTERN.sub('mm', joined)
+    joined = METRES_PATTERN.sub('m', joined)
+    joined = LINE_BREAK_PATTERN.sub('', joined)
+    joined = WHITESPACE_PATTERN.sub(' ', joined)
+    return [value.strip() for value in joined.split(CELL_SEPARATOR)]
+
+def clean_watch_frame(df):
+    """
+    Column-wise equivalent of clean_watch_data() for a frame of flattened, uncleaned
+    watch entries (one row per watch, one column per field or specification).
+
+    All text cells except the URL are joined into one string and every precompiled
+    pattern runs over it once, instead of four regex calls per field and record.
+    Column names are cleaned like specification keys. If two raw keys clean to the same
+    name, they are merged and the value of the later column wins where both are set.
+
+    Args:
+        df (pd.DataFrame): Uncleaned watch entries as produced by flatten_watch_data().
+
+    Returns:
+        pd.DataFrame: The cleaned entries.
+    """
+    text_columns = [column for column in df.columns if column != 'URL']
+    values = df[text_columns].to_numpy(dtype=object).ravel()
+    mask = pd.notna(values)
+    values[mask] = _clean_text_bulk(values[mask].tolist())
+
+    cleaned = df.copy()
+    cleaned[text_columns] = values.reshape(len(df), len(text_columns))
+    if 'Price' in cleaned.columns:
+        # Remove dollar sign and comma thousands separator from Price
+        cleaned['Price'] = cleaned['Price'].str.replace(PRICE_SYMBOLS_PATTERN, '', regex=True)
+
+    cleaned.columns = ['URL' if column == 'URL' else clean_text(column) for column in df.columns]
+    if cleaned.columns.has_duplicates:
+        merged = {}
+        for position, column in enumerate(cleaned.columns):
+            values = cleaned.iloc[:, position]
+            if column in merged:
+                # Keep the later non-missing value, like repeated keys in a dict
+                values = values.where(values.notna(), merged[column])
+            merged[column] = values
+        cleaned = pd.DataFrame(merged, index=df.index)
+
+    return cleaned
+
+
+def extract_item_links(soup):
+    """
+    Extracts href links from a BeautifulSoup object and filters them to keep only those containing '/item/'.
+    
+    Args:
+        soup (BeautifulSoup): A BeautifulSoup object containing the parsed HTML.
+
+    Returns:
+        list: A list of href links containing '/item/'.
+    """
+    links = []
+
+    # Find all anchor tags with href attributes
+    anchor_tags = soup.find_all('a', href=True)
+
+    # Filter links containing '/item/'
+    for tag in anchor_tags:
+        href = tag['href']
+        if '/item/' in href:
+            links.append(href)
+    
+    return links
@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteWorkQueue:
+    """
+    Shared work queue of item URLs backed by a SQLite file.
+
+    A coordinator pushes URLs; any number of worker processes lease batches of them.
+    A lease expires after `lease_seconds`, so the URLs of a worker that dies are
+    handed to another worker. Every lease counts as an attempt, and a URL that has
+    failed `max_attempts` times is marked 'failed' instead of being retried forever.
+
+    Workers on other nodes can share the queue through a network file system that
+    supports file locking.
+
+    Args:
+        path (str): Location of the SQLite file, created if missing.
+        lease_seconds (float): How long a worker owns the URLs it leased.
+        max_attempts (int): Number of leases after which a URL is given up.
+    """
+
+    def __init__(self, path, lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode, transactions are started explicitly where they are needed
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def reset(self):
+        """Empties the queue for a new run: drops every URL and the listing_done flag."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.execute('DELETE FROM tasks')
+        self.conn.execute('DELETE FROM meta')
+        self.conn.execute('COMMIT')
+
+    def push(self, urls):
+        """Adds URLs to the queue; URLs that are already queued or done are ignored."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany('INSERT OR IGNORE INTO tasks (url) VALUES (?)', [(url,) for url in urls])
+        self.conn.execute('COMMIT')
+
+    def lease(self, worker_id, n=50):
+        """Leases up to `n` pending URLs (or URLs whose lease expired) to `worker_id`."""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Expired leases that used up their attempts are given up
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', last_error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            urls = [row[0] for row in self.conn.execute(
+                "SELECT url FROM tasks WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, rowid LIMIT ?",
+                (now, n)
+            )]
+            self.conn.executemany(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE url = ?",
+                [(worker_id, now + self.lease_seconds, url) for url in urls]
+            )
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return urls
+
+    def complete(self, worker_id, urls):
+        """Marks URLs as done, unless their lease has meanwhile passed to another worker."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany(
+            "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL "
+            "WHERE url = ? AND lease_owner = ?",
+            [(url, worker_id) for url in urls]
+        )
+        self.conn.execute('COMMIT')
+
+    def fail(self, worker_id, url, error):
+        """Returns a URL to the queue for a retry, or gives it up after `max_attempts`."""
+        self.conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_expires = NULL, last_error = ? "
+            "WHERE url = ? AND lease_owner = ?",
+            (self.max_attempts, str(error), url, worker_id)
+        )
+
+    def set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def mark_listing_done(self):
+        """Called by the coordinator once every item URL has been pushed."""
+        self.set_meta('listing_done', '1')
+
+    @property
+    def listing_done(self):
+        return self.get_meta('listing_done') == '1'
+
+    def counts(self):
+        """Returns the number of URLs per status."""
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status'))
+
+    def is_finished(self):
+        """True once the listing is done and no URL is pending or leased anymore."""
+        counts = self.counts()
+        return self.listing_done and not counts.get('pending') and not counts.get('leased')
+
+    def close(self):
+        self.conn.close()
+
+
+def delete_queue(path):
+    """Removes a queue file together with its WAL files, if it exists."""
+    for file_path in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(file_path):
+            os.remove(file_path)
@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+def archive_key(url):
+    """Archive key of a URL: its path and query, so live and local URLs map to the same entry."""
+    parts = urlsplit(url)
+    return parts.path + ('?' + parts.query if parts.query else '')
+
+
+class ResponseArchive:
+    """
+    Local archive of recorded watchfinder.com responses.
+
+    Layout of `archive_dir`:
+        index.json         archive key (path + query) -> body file name
+        bodies/<sha256>    recorded page bodies
+
+    Args:
+        archive_dir (str): Directory of the archive, created if missing.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        os.makedirs(os.path.join(archive_dir, 'bodies'), exist_ok=True)
+        self._index_path = os.path.join(archive_dir, 'index.json')
+        self._lock = threading.Lock()
+
+        self.index = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+
+    def record(self, url, body):
+        """Stores the body of a page; listing pages are recorded after rendering."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(self.archive_dir, 'bodies', body_hash)
+        if not os.path.exists(body_path):
+            with open(body_path, 'wb') as f:
+                f.write(body)
+
+        with self._lock:
+            self.index[archive_key(url)] = body_hash
+            # Rewrite the index on every record, so an interrupted recording stays usable
+            with open(self._index_path + '.tmp', 'w') as f:
+                json.dump(self.index, f)
+            os.replace(self._index_path + '.tmp', self._index_path)
+
+    def lookup(self, url):
+        """Returns (body, body hash) of a recorded URL or path, or None."""
+        body_hash = self.index.get(archive_key(url))
+        if body_hash is None:
+            return None
+        with open(os.path.join(self.archive_dir, 'bodies', body_hash), 'rb') as f:
+            return f.read(), body_hash
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in for watchfinder.com that serves a ResponseArchive.
+
+    Point the scraper at it with `scrape_watchfinder(base_url=server.base_url)` (or the
+    WATCHFINDER_BASE_URL environment variable) to benchmark it offline and repeatably.
+    Responses carry an ETag, so conditional requests are answered with 304.
+
+    Args:
+        archive (ResponseArchive): Recorded responses to serve.
+        host (str): Interface to listen on.
+        port (int): Port to listen on, 0 picks a free one.
+        latency (tuple): (min, max) seconds of delay added to every response.
+        error_rate (float): Fraction of requests answered with `error_status` instead.
+        error_status (int): Status code of injected errors.
+        seed (int): Seed of the random generator for latency and errors, for repeatable runs.
+    """
+
+    def __init__(self, archive, host='127.0.0.1', port=0, latency=(0.0, 0.0), error_rate=0.0,
+                 error_status=503, seed=None):
+        self.archive = archive
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.requests_served = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handle(self, request):
+        with self._random_lock:
+            delay = self._random.uniform(*self.latency)
+            inject_error = self._random.random() < self.error_rate
+            self.requests_served += 1
+        if delay:
+            time.sleep(delay)
+
+        if inject_error:
+            request.send_response(self.error_status)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        recorded = self.archive.lookup(request.path)
+        if recorded is None:
+            body = b'<html><body>Not recorded</body></html>'
+            request.send_response(404)
+            request.send_header('Content-Type', 'text/html; charset=utf-8')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+            return
+
+        body, body_hash = recorded
+        etag = f'"{body_hash[:16]}"'
+        if request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        """Serves in a background thread and returns the base URL."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded watchfinder.com responses locally.')
+    parser.add_argument('archive_dir', help='Directory recorded with scrape_watchfinder(record_to=...)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, nargs=2, default=(0.0, 0.0), metavar=('MIN', 'MAX'),
+                        help='Delay range in seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.archive_dir)
+    server = ReplayServer(archive, host=args.host, port=args.port, latency=tuple(args.latency),
+                          error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f'Replaying {len(archive.index)} recorded pages at {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
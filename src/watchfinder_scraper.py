@@ -1,243 +1,415 @@
-import pandas as pd
+import argparse
+import os
 import requests
 from bs4 import BeautifulSoup
-import re
-import sys
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 
-def url_to_soup(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    return soup
-
-def extract_watch_data(soup):
-    # Extract Model and Reference Code
-    model = soup.find('meta', {'itemprop': 'model'}).get('content', 'N/A')
-    reference_code = soup.find('meta', {'itemprop': 'mpn'}).get('content', 'N/A')
-
-    # Extract Price
-    price_span = soup.find('span', {'class': 'h2 bold reduced-padding'})
-    price = price_span.text.strip() if price_span else 'N/A'
-
-    # Extract Specifications
-    specs_table = soup.find('div', {'id': 'specification-content'}).find('table')
-    specifications = {}
-
-    # Loop through each row of the table
-    for row in specs_table.find_all('tr'):
-        cols = row.find_all('td')
-        if len(cols) == 2:
-            name = cols[0].text.strip().replace(':', '')
-            value = cols[1].text.strip()
-            specifications[name] = value
-
-    # Display the extracted data
-    watch_data = {
-        "Model": model,
-        "Reference Code": reference_code,
-        "Price": price,
-        "Specifications": specifications
-    }
-
-    return watch_data
-
-def clean_watch_data(watch_data_dict):
-    # Helper function to clean individual strings
-    def clean_text(text):
-        # Lowercase "MM"
-        text = re.sub(r'\bMM\b', 'mm', text)
-        # Convert "metres" to "m"
-        text = re.sub(r'\bmetres\b', 'm', text)
-        # Remove \r and \n
-        text = text.replace('\r', '').replace('\n', '')
-        # Remove extra whitespaces
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
-    # Clean Model and Reference Code
-    watch_data_dict['Model'] = clean_text(watch_data_dict.get('Model', 'N/A'))
-    watch_data_dict['Reference Code'] = clean_text(watch_data_dict.get('Reference Code', 'N/A'))
-    watch_data_dict['Price'] = clean_text(watch_data_dict.get('Price', 'N/A'))
-    # Remove dollar sign and comma thousands separator from Price
-    watch_data_dict['Price'] = re.sub(r'[$,]', '', watch_data_dict['Price'])
-    
-    # Clean Specifications
-    cleaned_specs = {}
-    for key, value in watch_data_dict.get('Specifications', {}).items():
-        cleaned_key = clean_text(key)
-        cleaned_value = clean_text(value)
-        cleaned_specs[cleaned_key] = cleaned_value
-        
-    watch_data_dict['Specifications'] = cleaned_specs
-    
-    return watch_data_dict
-
-
-def extract_item_links(soup):
+from watchfinder_cache import PageCache, ScrapeJournal
+from watchfinder_fetcher import DEFAULT_PER_HOST_RATE, AsyncPageFetcher
+from watchfinder_frontier import CrawlFrontier
+from watchfinder_replay import ResponseArchive
+from watchfinder_metrics import ProgressReporter, ScrapeMetrics
+from watchfinder_parse_pool import ParsePool, row_to_watch_data
+from watchfinder_writer import StreamingResultsWriter
+from watchfinder_parser import (
+    DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, clean_watch_frame, extract_item_links, extract_watch_data, parse_watch_page
+)
+
+# Site the scraper talks to. Output URLs always use WATCHFINDER_URL; BASE_URL is where
+# requests actually go, e.g. a local ReplayServer for offline benchmarks.
+WATCHFINDER_URL = 'https://www.watchfinder.com'
+BASE_URL = os.environ.get('WATCHFINDER_BASE_URL', WATCHFINDER_URL)
+
+def resolve_url(url, base_url=None):
     """
-    Extracts href links from a BeautifulSoup object and filters them to keep only those containing '/item/'.
-    
-    Args:
-        soup (BeautifulSoup): A BeautifulSoup object containing the parsed HTML.
-
-    Returns:
-        list: A list of href links containing '/item/'.
+    Maps a watchfinder.com URL or a site-relative path onto `base_url` (BASE_URL by default).
     """
-    links = []
-
-    # Find all anchor tags with href attributes
-    anchor_tags = soup.find_all('a', href=True)
-
-    # Filter links containing '/item/'
-    for tag in anchor_tags:
-        href = tag['href']
-        if '/item/' in href:
-            links.append(href)
-    
-    return links
-
-product_list_url = 'https://www.watchfinder.com/Tag%20Heuer/Carrera/watches'
+    base_url = (base_url or BASE_URL).rstrip('/')
+    if url.startswith(WATCHFINDER_URL):
+        url = url[len(WATCHFINDER_URL):]
+    if url.startswith('/'):
+        return base_url + url
+    return url
+
+# Tag Heuer collections crawled on watchfinder.com
+TAG_HEUER_COLLECTIONS = [
+    'Carrera',
+    'Monaco',
+    'Aquaracer',
+    'F1',
+    'Link',
+    'Autavia'
+]
+
+# CSS selector matching the anchors extract_item_links() keeps
+ITEM_LINK_SELECTOR = "a[href*='/item/']"
+
+# URL patterns blocked when resource blocking is enabled: images, fonts and trackers
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*',
+]
 
 class SeleniumSoupMaker:
-    def __init__(self):
-            # Set up Chrome options
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")  # Run in headless mode (no browser window)
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
+    """
+    Renders listing pages in a headless Chrome and returns them as BeautifulSoup objects.
 
-            # Use local ChromeDriver path
-            driver_path = "./data/chromedriver-mac-arm64/chromedriver"
-            self.driver = webdriver.Chrome(service=ChromeService(driver_path), options=chrome_options)
+    Args:
+        wait_timeout (float): Maximum number of seconds to wait for item links to appear.
+        block_resources (bool): Block images, fonts and trackers to cut render time.
+        base_url (str): Site pages are loaded from, see resolve_url().
+        archive (ResponseArchive): Optional archive every rendered page is recorded to.
+    """
 
+    def __init__(self, wait_timeout=10, block_resources=False, base_url=None, archive=None):
+        # Set up Chrome options
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # Run in headless mode (no browser window)
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        if block_resources:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+
+        # Use local ChromeDriver path
+        driver_path = "./data/chromedriver-mac-arm64/chromedriver"
+        self.driver = webdriver.Chrome(service=ChromeService(driver_path), options=chrome_options)
+        self.wait_timeout = wait_timeout
+        self.base_url = base_url
+        self.archive = archive
+
+        if block_resources:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
 
     def get_soup(self, url):
-            # Open the webpage
-            self.driver.get(url)
-
-            time.sleep(2)
-
-            # Get the full page HTML
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-
-            return soup
+        # Open the webpage
+        self.driver.get(resolve_url(url, self.base_url))
+
+        # Wait until the item links are rendered instead of sleeping for a fixed time.
+        # Pages past the end of a collection never get any, so a timeout is not an error.
+        try:
+            WebDriverWait(self.driver, self.wait_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ITEM_LINK_SELECTOR))
+            )
+        except TimeoutException:
+            pass
+
+        # Get the full page HTML
+        html = self.driver.page_source
+        if self.archive is not None:
+            self.archive.record(url, html)
+        soup = BeautifulSoup(html, 'html.parser')
+
+        return soup
 
     def close(self):
-            self.driver.quit()
-
-def extract_watch_data(soup):
-    # Extract Model and Reference Code
-    model = soup.find('meta', {'itemprop': 'model'}).get('content', 'N/A')
-    reference_code = soup.find('meta', {'itemprop': 'mpn'}).get('content', 'N/A')
-
-    # Extract Price
-    price_span = soup.find('span', {'class': 'h2 bold reduced-padding'})
-    price = price_span.text.strip() if price_span else 'N/A'
-
-    # If no regular price, check for discounted price
-    if price == 'N/A':
-        discount_price_span = soup.find('span', {'class': 'h2 bold reduced-padding with-saving'})
-        price = discount_price_span.text.strip() if discount_price_span else 'N/A'
-
-    # Extract Specifications
-    specs_table = soup.find('div', {'id': 'specification-content'}).find('table')
-    specifications = {}
-
-    # Loop through each row of the table
-    for row in specs_table.find_all('tr'):
-        cols = row.find_all('td')
-        if len(cols) == 2:
-            name = cols[0].text.strip().replace(':', '')
-            value = cols[1].text.strip()
-            specifications[name] = value
-
-    # Display the extracted data
-    watch_data = {
-        "Model": model,
-        "Reference Code": reference_code,
-        "Price": price,
-        "Specifications": specifications
-    }
+        self.driver.quit()
 
-    return watch_data
-
-import os
+def crawl_listings(collection_urls, frontier, n_drivers=3, block_resources=False, max_pages=50, on_new_links=None,
+                   metrics=None, base_url=None, archive=None):
+    """
+    Renders the listing pages of every collection with a pool of Chrome drivers and
+    feeds the item links they contain into a CrawlFrontier.
 
-def scrape_watchfinder(output_dir='scraper_output'):
-    collections = [
-        'Carrera',
-        'Monaco',
-        'Aquaracer',
-        'F1',
-        'Link',
-        'Autavia'
-    ]
+    Collections are split into `n_drivers` shards and every shard is crawled by its own
+    driver in a separate thread. Each collection is paginated until a page yields no
+    item links that collection hasn't shown before, or `max_pages` is reached.
 
-    # Define list to store all watch links
-    watch_links = []
+    Args:
+        collection_urls (list): Base listing URL of every collection (without ?pageno).
+        frontier (CrawlFrontier): Receives the discovered item links.
+        n_drivers (int): Number of Chrome instances to run at once.
+        block_resources (bool): Block images, fonts and trackers in every driver.
+        max_pages (int): Safety limit on the number of pages per collection.
+        on_new_links (callable): Called with every list of links new to the frontier.
+        metrics (ScrapeMetrics): Optional metrics receiving the render time of every page.
+        base_url (str): Site the listing pages are loaded from, see resolve_url().
+        archive (ResponseArchive): Optional archive the rendered listing pages are recorded to.
+    """
+    n_drivers = max(1, min(n_drivers, len(collection_urls)))
+    shards = [collection_urls[i::n_drivers] for i in range(n_drivers)]
+
+    def crawl_collection(chrome_bot, collection_url):
+        collection_links = set()
+        for page in range(1, max_pages + 1):
+            start = time.perf_counter()
+            item_links = extract_item_links(chrome_bot.get_soup(collection_url + f'?pageno={page}'))
+            if metrics is not None:
+                metrics.add_stage_time('render', time.perf_counter() - start)
+                metrics.increment('listing_pages')
+            page_links = set(item_links) - collection_links
+            if not page_links:
+                # Past the last page the site shows no items (or repeats a page we've seen)
+                break
+            collection_links |= page_links
+
+            new_links = frontier.add(item_links)
+            if new_links and on_new_links:
+                on_new_links(new_links)
+
+    def crawl_shard(shard):
+        chrome_bot = SeleniumSoupMaker(block_resources=block_resources, base_url=base_url, archive=archive)
+        try:
+            for collection_url in shard:
+                crawl_collection(chrome_bot, collection_url)
+        finally:
+            chrome_bot.close()
+
+    with ThreadPoolExecutor(max_workers=n_drivers) as executor:
+        # list() re-raises any exception from the shards
+        list(executor.map(crawl_shard, shards))
+
+def flatten_watch_data(url, watch_data):
+    """
+    Flattens the extracted data of a single item page into one row of the results,
+    with one column per specification. The row is not cleaned yet; that happens for
+    a whole batch at once in clean_watch_frame().
+    """
+    # Create a dictionary for the current watch data
+    watch_entry = {
+        'URL': url,
+        'Model': watch_data['Model'],
+        'Reference Code': watch_data['Reference Code'],
+        'Price': watch_data['Price']
+    }
 
-    chrome_bot = SeleniumSoupMaker()
+    # Flatten the specifications dictionary
+    for spec_key, spec_value in watch_data['Specifications'].items():
+        watch_entry[spec_key] = spec_value
 
-    for collection in collections:
-        print(f'Getting links to watches in the {collection} collection...')
-        collection_base_url = f'https://www.watchfinder.com/Tag%20Heuer/{collection}/watches'
-        
-        for i in range(1, 6):
-            watches_url = collection_base_url + f'?pageno={i}'
-            watches_soup = chrome_bot.get_soup(watches_url)
-            item_links = extract_item_links(watches_soup)
-            watch_links.extend(item_links)
+    return watch_entry
 
-    # Remove duplicates from watch_links
-    watch_links = list(set(watch_links))
-    print(f'Found {len(watch_links)} unique watch links.')
+def scrape_watchfinder(output_dir='scraper_output', fetch_mode='async', concurrency=8,
+                       n_drivers=3, block_resources=False, parser=DEFAULT_PARSER_BACKEND,
+                       cache_dir='scraper_cache', batch_size=50, output_format='csv', base_url=None,
+                       record_to=None, parse_workers=None, per_host_rate=DEFAULT_PER_HOST_RATE):
+    """
+    Scrapes all Tag Heuer listings on watchfinder.com and writes them to
+    `output_dir/watchfinder_scraping_results.csv` (or `.parquet`).
 
-    # Close the Chrome bot
-    chrome_bot.close()
+    Args:
+        output_dir (str): Directory the results CSV is written to.
+        fetch_mode (str): 'async' fetches item pages concurrently with AsyncPageFetcher,
+            'sequential' fetches them one at a time with requests.
+        concurrency (int): Maximum number of item pages fetched at once in async mode.
+        per_host_rate (float): Maximum item page requests per second in async mode, 0 for
+            no limit (e.g. against a local ReplayServer, to benchmark the fetcher itself).
+        n_drivers (int): Number of Chrome instances rendering listing pages in parallel.
+        block_resources (bool): Block images, fonts and trackers while rendering listings.
+        parser (str): Backend parse_watch_page() uses for item pages fetched in async mode.
+        cache_dir (str): Directory of the on-disk page cache used in async mode (None disables it).
+        batch_size (int): Number of item pages fetched, and rows streamed to disk, per batch.
+        output_format (str): 'csv' or 'parquet'.
+        base_url (str): Site requests go to (BASE_URL by default), e.g. a local ReplayServer.
+            The URLs in the results always point at watchfinder.com.
+        record_to (str): Optional directory of a ResponseArchive that every listing and
+            item page is recorded to, for replaying with watchfinder_replay.py.
+        parse_workers (int): Worker processes parsing item pages in async mode, defaults to
+            the number of CPUs. 0 parses in the main process.
+
+    Per-stage timings and counters are written to `output_dir/scrape_report.json` and
+    `output_dir/scrape_metrics.prom` (Prometheus text format).
+
+    Rows are streamed to disk by a StreamingResultsWriter as they are produced, and
+    cleaned a batch at a time by clean_watch_frame() on the way. An
+    interrupted run leaves `output_dir/scrape_journal.jsonl` and the writer's part
+    files behind. The next call resumes from them, skipping every watch that is
+    already done, and the listing crawl too if it had completed.
+
+    The listing crawl runs in a background thread and feeds a CrawlFrontier, so item
+    pages are fetched while listing pages are still being rendered.
+    """
+    collections = TAG_HEUER_COLLECTIONS
 
-    watch_results = []
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+    journal = ScrapeJournal(os.path.join(output_dir, 'scrape_journal.jsonl'))
+    output_file = os.path.join(output_dir, f'watchfinder_scraping_results.{output_format}')
+    metrics = ScrapeMetrics()
+    archive = ResponseArchive(record_to) if record_to else None
+    progress = ProgressReporter(metrics)
+
+    def clean_batch(batch_df):
+        with metrics.stage('clean'):
+            return clean_watch_frame(batch_df)
+
+    writer = StreamingResultsWriter(output_file, output_format=output_format, batch_size=batch_size,
+                                    transform=clean_batch)
+    done_urls = writer.completed_urls()
+
+    # Links journaled by an interrupted run are queued again, the crawl only adds new ones
+    frontier = CrawlFrontier()
+    frontier.add(journal.links)
+
+    if journal.listing_done:
+        frontier.finish()
+        print(f'Resuming scrape: {len(done_urls)} of {len(journal.links)} watches already done.')
+    else:
+        collection_urls = [f'{WATCHFINDER_URL}/Tag%20Heuer/{collection}/watches'
+                           for collection in collections]
+
+        def crawl():
+            try:
+                crawl_listings(collection_urls, frontier, n_drivers=n_drivers,
+                               block_resources=block_resources, on_new_links=journal.record_links,
+                               metrics=metrics, base_url=base_url, archive=archive)
+                journal.record_listing_done()
+                print(f'Listing crawl complete: found {len(frontier)} unique watch links.')
+            finally:
+                frontier.finish()
+
+        print(f'Getting links to watches in the {", ".join(collections)} collections '
+              f'with {n_drivers} browsers...')
+        # The listing crawl runs in the background while item pages are fetched below
+        crawl_thread = threading.Thread(target=crawl, daemon=True)
+        crawl_thread.start()
+
+    def timed_parse(extract):
+        # Records the parse time of one page; pages that don't parse count as failures
+        start = time.perf_counter()
+        try:
+            return extract()
+        except Exception as e:
+            metrics.increment('failures', type=f'parse:{type(e).__name__}')
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.add_stage_time('parse', elapsed)
+            metrics.observe('parse_ms', elapsed * 1000)
 
     print('Extracting data for each watch...')
-    for link in watch_links:
-        url = 'https://www.watchfinder.com' + link
-        soup = url_to_soup(url)
-        watch_data = extract_watch_data(soup)
-        cleaned_watch_data = clean_watch_data(watch_data)
-        
-        # Create a dictionary for the current watch data
-        watch_entry = {
-            'URL': url,
-            'Model': cleaned_watch_data['Model'],
-            'Reference Code': cleaned_watch_data['Reference Code'],
-            'Price': cleaned_watch_data['Price']
-        }
-        
-        # Flatten the specifications dictionary
-        for spec_key, spec_value in cleaned_watch_data['Specifications'].items():
-            watch_entry[spec_key] = spec_value
-        
-        print(watch_entry)
-        watch_results.append(watch_entry)
-
+    def emit(url, watch_data):
+        writer.write(flatten_watch_data(url, watch_data))
+        metrics.increment('watches_scraped')
+        progress.update()
+
+    if fetch_mode == 'async':
+        cache = PageCache(cache_dir) if cache_dir else None
+        fetcher = AsyncPageFetcher(concurrency=concurrency, per_host_rate=per_host_rate, cache=cache, metrics=metrics)
+        parse_pool = ParsePool(workers=parse_workers, backend=parser) if parse_workers != 0 else None
+        # Bodies handed to the parse pool, kept until their row is back so the result can be cached
+        parsing = {}
+
+        def handle_row(row):
+            url, parse_ms, error = row[0], row[6], row[7]
+            content = parsing.pop(url)
+            metrics.add_stage_time('parse', parse_ms / 1000)
+            metrics.observe('parse_ms', parse_ms)
+            if error is not None:
+                metrics.increment('failures', type=f'parse:{error}')
+                return
+            watch_data = row_to_watch_data(row)
+            if cache:
+                cache.store_parsed(content, watch_data)
+            emit(url, watch_data)
+
+        # Fetch in batches as links are discovered, so finished watches reach the disk while the scrape runs
+        for links in frontier.batches(batch_size):
+            item_urls = [WATCHFINDER_URL + link for link in links]
+            pending_urls = {resolve_url(url, base_url): url for url in item_urls if url not in done_urls}
+            for fetch_url, content in fetcher.fetch_all(pending_urls):
+                if content is None:
+                    continue
+                url = pending_urls[fetch_url]
+                if archive is not None:
+                    archive.record(url, content)
+
+                # Unchanged pages reuse the data extracted from the same body last time
+                watch_data = cache.load_parsed(content) if cache else None
+                if watch_data is not None:
+                    metrics.increment('cache_hits', kind='parsed')
+                    emit(url, watch_data)
+                elif parse_pool is not None:
+                    # Parsing continues in the worker processes while the next batch is fetched
+                    parsing[url] = content if cache else None
+                    for row in parse_pool.submit(url, content):
+                        handle_row(row)
+                else:
+                    watch_data = timed_parse(lambda: parse_watch_page(content, backend=parser))
+                    if watch_data is None:
+                        continue
+                    if cache:
+                        cache.store_parsed(content, watch_data)
+                    emit(url, watch_data)
+
+        if parse_pool is not None:
+            for row in parse_pool.drain():
+                handle_row(row)
+            parse_pool.close()
+
+        fetcher.close()
+        print(f'Fetched {fetcher.pages_fetched} pages in {fetcher.elapsed:.1f}s - '
+              f'{fetcher.pages_per_second:.2f} pages/sec')
+    else:
+        for links in frontier.batches(batch_size):
+            for link in links:
+                url = WATCHFINDER_URL + link
+                if url in done_urls:
+                    continue
+                try:
+                    with metrics.stage('fetch'):
+                        response = requests.get(resolve_url(url, base_url))
+                        response.raise_for_status()
+                except requests.RequestException as e:
+                    metrics.increment('failures', type=type(e).__name__)
+                    print(f'Failed to fetch {url}: {e}')
+                    continue
+                metrics.increment('pages_fetched')
+                metrics.increment('bytes_fetched', len(response.content))
+                if archive is not None:
+                    archive.record(url, response.content)
+
+                watch_data = timed_parse(lambda: extract_watch_data(BeautifulSoup(response.content, 'html.parser')))
+                if watch_data is None:
+                    continue
+                emit(url, watch_data)
+
+    if not journal.listing_done:
+        # The crawl thread has already finished the frontier; surface a failed crawl here
+        crawl_thread.join()
+        if not journal.listing_done:
+            raise RuntimeError('Listing crawl failed, rerun to resume the scrape.')
+
+    progress.update(force=True)
     print('Extraction complete!')
 
-    print('Converting data to DataFrame...')
-    # Convert the list of dictionaries to a DataFrame
-    results_df = pd.DataFrame(watch_results)
-    print('Data conversion complete!')
-
-    results_df = results_df[results_df['Price'] != 'N/A']
-    
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, 'watchfinder_scraping_results.csv')
-    results_df.to_csv(output_file, index=False)
+    with metrics.stage('write'):
+        writer.close()
     print(f'Data saved to {output_file}')
 
+    metrics.write(os.path.join(output_dir, 'scrape_report.json'), os.path.join(output_dir, 'scrape_metrics.prom'))
+    print(f'Run report saved to {output_dir}/scrape_report.json and scrape_metrics.prom')
+
+    # The run is complete, so the next one starts from scratch (pages stay cached)
+    journal.finish()
+
 if __name__ == "__main__":
-    scrape_watchfinder()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description='Scrape Tag Heuer watches from watchfinder.com.')
+    arg_parser.add_argument('--output-dir', default='scraper_output')
+    arg_parser.add_argument('--fetch-mode', choices=['async', 'sequential'], default='async')
+    arg_parser.add_argument('--concurrency', type=int, default=8)
+    arg_parser.add_argument('--per-host-rate', type=float, default=DEFAULT_PER_HOST_RATE,
+                            help='Maximum item page requests per second (0: no limit, e.g. for replay runs)')
+    arg_parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND)
+    arg_parser.add_argument('--parse-workers', type=int, default=None,
+                            help='Processes parsing item pages (default: number of CPUs, 0: main process)')
+    arg_parser.add_argument('--base-url', default=None,
+                            help='Site to scrape instead of watchfinder.com, e.g. a local replay server')
+    arg_parser.add_argument('--record-to', default=None,
+                            help='Record every page to this archive directory for later replay')
+    args = arg_parser.parse_args()
+
+    scrape_watchfinder(output_dir=args.output_dir, fetch_mode=args.fetch_mode, concurrency=args.concurrency,
+                       parser=args.parser, base_url=args.base_url, record_to=args.record_to,
+                       parse_workers=args.parse_workers, per_host_rate=args.per_host_rate)
\ No newline at end of file
@@ -0,0 +1,130 @@
+import glob
+import os
+
+import pandas as pd
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+
+def read_part(path, **kwargs):
+    # Read everything back as text and keep 'N/A' as is, so values round-trip unchanged
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''], **kwargs)
+
+
+def merge_part_files(part_files, output_file, output_format='csv'):
+    """
+    Merges part files into one results file, one part at a time.
+
+    The columns of all parts are unioned in first-seen order, rows without a price
+    are dropped and, if a URL appears in several parts (e.g. a page that was
+    scraped again after a worker died), only its first row is kept.
+
+    Args:
+        part_files (list): Paths of the CSV part files, in output order.
+        output_file (str): Path of the merged CSV or Parquet file.
+        output_format (str): 'csv' or 'parquet'.
+    """
+    columns = {}
+    for path in part_files:
+        for column in read_part(path, nrows=0).columns:
+            columns.setdefault(column, None)
+    columns = list(columns)
+    seen_urls = set()
+
+    def prepare_part(path):
+        part_df = read_part(path)
+        part_df = part_df[(part_df['Price'] != 'N/A') & ~part_df['URL'].isin(seen_urls)]
+        part_df = part_df.drop_duplicates(subset='URL')
+        seen_urls.update(part_df['URL'])
+        return part_df.reindex(columns=columns)
+
+    if output_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        with pq.ParquetWriter(output_file, schema) as parquet_writer:
+            for path in part_files:
+                # One row group per part keeps the merge's memory bounded by the batch size
+                parquet_writer.write_table(pa.Table.from_pandas(prepare_part(path), schema=schema, preserve_index=False))
+    else:
+        with open(output_file, 'w', newline='') as f:
+            pd.DataFrame(columns=columns).to_csv(f, index=False)
+            for path in part_files:
+                prepare_part(path).to_csv(f, index=False, header=False)
+
+
+class StreamingResultsWriter:
+    """
+    Streams scraped watch entries to disk in batches instead of holding them in memory.
+
+    Every `batch_size` rows are written atomically to a numbered part file in
+    `parts_dir`. Rows may carry different specification keys, so each part keeps
+    its own columns; close() merges the parts into the final CSV or Parquet file
+    with merge_part_files().
+
+    Part files survive a crash, so a resumed scrape can skip the URLs they contain
+    (see completed_urls()).
+
+    Args:
+        output_file (str): Path of the final results file (may be None if the parts are
+            merged elsewhere, e.g. by merge_partitions()).
+        output_format (str): 'csv' or 'parquet'.
+        batch_size (int): Number of rows buffered before a part file is written.
+        parts_dir (str): Directory for the part files, defaults to `<output_file>.parts`.
+        transform (callable): Optional function applied to every batch DataFrame before
+            it is written, e.g. clean_watch_frame.
+    """
+
+    def __init__(self, output_file, output_format='csv', batch_size=100, parts_dir=None, transform=None):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+        self.output_file = output_file
+        self.output_format = output_format
+        self.batch_size = batch_size
+        self.transform = transform
+        self.parts_dir = parts_dir or output_file + '.parts'
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+        self._buffer = []
+        self._next_part = len(self._part_files())
+        self.rows_written = 0
+
+    def _part_files(self):
+        return sorted(glob.glob(os.path.join(self.parts_dir, 'part-*.csv')))
+
+    def completed_urls(self):
+        """Returns the set of URLs already written to part files, e.g. by an interrupted run."""
+        urls = set()
+        for path in self._part_files():
+            urls.update(read_part(path, usecols=['URL'])['URL'])
+        return urls
+
+    def write(self, watch_entry):
+        self._buffer.append(watch_entry)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        path = os.path.join(self.parts_dir, f'part-{self._next_part:05d}.csv')
+        batch_df = pd.DataFrame(self._buffer)
+        if self.transform is not None:
+            batch_df = self.transform(batch_df)
+        batch_df.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+        self.rows_written += len(self._buffer)
+        self._next_part += 1
+        self._buffer = []
+
+    def close(self):
+        """Writes the remaining rows, merges all parts into `output_file` and removes them."""
+        self.flush()
+        part_files = self._part_files()
+        merge_part_files(part_files, self.output_file, self.output_format)
+
+        for path in part_files:
+            os.remove(path)
+        os.rmdir(self.parts_dir)